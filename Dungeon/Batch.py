@@ -0,0 +1,79 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from Dungeon import Dungeon
+from Dungeon import Floor
+
+
+'''
+Batch floor generation
+
+Workers send back only the compact Grid of each floor, or its packed floor file, never the whole Dungeon
+'''
+def generate(params, seed):
+	"""
+	Generate one floor and return its grid
+	"""
+	return Dungeon.generate(params, seed).grid
+
+def generatePacked(params, seed, encoding):
+	"""
+	Generate one floor and return it packed as floor file bytes
+	"""
+	return Floor.pack(Dungeon.generate(params, seed), encoding)
+
+def _generateAll(jobs):
+	return [generate(params, seed) for params, seed in jobs]
+
+def _packAll(jobs):
+	return [generatePacked(params, seed, encoding) for params, seed, encoding in jobs]
+
+def generateMany(params, seeds, workers = None):
+	"""
+	Generate one floor per seed across a pool of @workers processes (all CPUs by default), returning grids in seed order
+
+	@params is either one parameter dictionary shared by every seed or a list with one dictionary per seed
+	"""
+	return list(iterMany(params, seeds, workers))
+
+def iterMany(params, seeds, workers = None):
+	"""
+	Like generateMany, but yield each grid as soon as it and every grid before it are done
+	"""
+	return _stream(_generateAll, _jobs(params, seeds), workers)
+
+def packMany(params, seeds, workers = None, encoding = Floor.NIBBLE):
+	"""
+	Like iterMany, but yield floor file bytes, which also carry each floor's seed and parameters
+	"""
+	return _stream(_packAll, [job + (encoding,) for job in _jobs(params, seeds)], workers)
+
+
+'''
+Helpers
+'''
+def _jobs(params, seeds):
+	seeds = list(seeds)
+	params = params if isinstance(params, list) else [params] * len(seeds)
+
+	if len(params) != len(seeds):
+		raise ValueError('Expected one parameter dictionary per seed')
+
+	return list(zip(params, seeds))
+
+def _stream(work, jobs, workers):
+	workers = workers or os.cpu_count() or 1
+
+	if workers == 1 or len(jobs) < 2:
+		for job in jobs:
+			yield work([job])[0]
+		return
+
+	# Hand each worker a few large chunks so that process round trips stay rare
+	size = max(1, len(jobs) // (workers * 4))
+	chunks = [jobs[i:i + size] for i in range(0, len(jobs), size)]
+
+	with ProcessPoolExecutor(max_workers = workers) as pool:
+		for chunk in pool.map(work, chunks):
+			for result in chunk:
+				yield result
\ No newline at end of file
@@ -1,6 +1,6 @@
-from Dungeon.Components.Sets.CoordinateSet import CoordinateSet
-
-'''
-Default refers to empty cells into which assets have not been written
-'''
+from Dungeon.Components.Sets.CoordinateSet import CoordinateSet
+
+'''
+Default refers to empty cells into which assets have not been written
+'''
 symbol = ' '
\ No newline at end of file
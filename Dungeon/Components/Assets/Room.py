@@ -1,282 +1,512 @@
-from Dungeon.Components.CardinalDirection import Direction
-
-
-'''
-A Room in the dungeon
-
-Hidden properties define the room's structure
-	@_upperLeft marks the leftmost x-coordinate and the top y-coordinate in that column
-	@_lowerRight marks the rightmost x-coordinate and the bottom y-coordinate in that column
-'''
-class Room():
-	symbol = 'R'
-
-
-	'''
-	Constructors
-	'''
-	def init():
-		"""
-		Create a room with no coordinates in it
-		"""
-		self._members = {}
-		self._upperLeft = None
-		self._lowerRight = None
-
-	@classmethod
-	def createRect(cls, upperLeft, lowerRight):
-		"""
-		Create a rectangular room
-		"""
-		r = Room()
-
-		r._upperLeft = upperLeft
-		r._lowerRight = lowerRight
-
-		for x in range(upperLeft[0], lowerRight[0] + 1):
-			# Map x coordinates to a dictionary of y coordinates
-			r._members[x] = {}
-
-			# Map y coordinates to number of cells inside the room
-			for y in range(upperLeft[1], lowerRight[0] + 1):
-				r._members[x][y] = lowerRight[1] - upperLeft[1] + 1
-
-		return r
-
-	@classmethod
-	def fromFile(cls, filename):
-		"""
-		Create a room from a file containing the room representation
-		"""
-		r = Room()
-
-		with open(filename) as f:
-			lineCount = 0
-			charCount = 0
-
-			for line in f.readLine():
-				for l in line:
-					if l == Room.symbol:
-						r.insert((charCount, lineCount))
-					charCount += 1
-
-				lineCount += 1
-				charCount = 0
-
-			f.close()
-
-		return r
-
-
-	'''
-	Operations on rooms
-	'''
-	def exists(self, **kwargs):
-		"""
-		Check if a coordinate exists in the room
-
-		On True, return dictionary location as tuple
-		On False, return None
-		"""
-		if 'x' in kwargs:
-			x = kwargs['x']
-
-		if 'y' in kwargs:
-			y = kwargs['y']
-
-		if 'coord' in kwargs:
-			x, y = kwargs['coord']
-
-		if x in self._members:
-			for key, value in self._members[x]:
-				if y in range(key, key + value + 1):
-					return (x, key)
-		
-		return None
-
-	def isContiguous(self):
-		"""
-		Starting from _upperLeft, check to see if the room is contiguous
-		"""
-		# Blank rooms are vacuously contiguous
-		if self._upperLeft == None:
-			return True
-
-		# Test if segment AB overlaps with segment CD
-		def overlap(a, b, c, d):
-			return b - c >= 0 and d - a >= 0
-
-		# The current segment is contiguous if it overlaps with something to the right
-		# Reaching the next column to operate on means that every segment to the left is already known to be contiguous
-		islands = []
-		for x in range(self._upperLeft[0], self._lowerRight[0]):
-			for y in self._members[x]:
-				coord = tuple([x, y])
-				island = set([])
-
-				# Check for overlap
-				# There is no need to check the last column because there will be nothing to the right
-				for y2 in self._members[x + 1]:
-					if overlap(y, y + self._members[x][y], y2, y2 + self._members[x + 1][y2]):
-						island.add(tuple([x + 1, y2]))
-						break
-
-				# Merge the island into an existing one if there is overlap
-				for i in islands:
-					# There are common elements if the intersection is less than the sum
-					if len(island | i) < len(island) + len(i):
-						i |= island
-						island = None
-						break
-
-				# The island remains and island if it wasn't merged
-				if not island == None:
-					islands.append(island)
-
-		# For the last column, verify that everything exists in the 0th island
-		for y in self._members[self._lowerRight[0]]:
-			if not tuple([self._lowerRight[0], y]) in islands[0]:
-				return False
-
-		# If there is only 1 island, there is at least 1 path between every segment
-		return len(islands) == 1
-
-	def insert(self, coord):
-		"""
-		Insert an x, y coordinate, returning True on success
-		
-		Fails to insert if the coordinate is already in the room
-		Fails to insert if the room becomes non-contiguous
-		"""
-		# Already in the room
-		if not self.exists({'coord': coord}) == None:
-			return False
-
-		# Find any existing segments to the north, east, south, and west
-		north = self.exists({'coord': Direction.moveFrom(coord, 'n')})
-		east = self.exists({'coord': Direction.moveFrom(coord, 'e')})
-		south = self.exists({'coord': Direction.moveFrom(coord, 's')})
-		west = self.exists({'coord': Direction.moveFrom(coord, 'w')})
-
-		# An insert causes a non-contiguous room if the new @coord is not adjacent to anything in already in the room
-		if north == None and east == None and south == None and west == None:
-			return False
-
-		# Perform the insertion and merge if possible
-		if not coord[0] in self._members:
-			self._members[coord[0]][coord[1]] = 1
-		elif not north == None:
-			# Add to segment to the north
-			self._members[north[0]][north[1]] += 1
-
-			# Merge north and south segments if they now touch
-			if not south == None:
-				self._members[north[0]][north[1]] += self._members[south[0]][south[1]]
-				del self._members[south[0]][south[1]]
-		elif not south == None:
-			# Add to segment to the south
-			self._members[coord[0]][coord[1]] = self._members[south[0]][south[1]] + 1
-			del self._members[south[0]][south[1]]
-		else:
-			# Add as its own segment
-			self._members[coord[0]][coord[1]] = 1
-
-		# Update _upperLeft or _lowerRight if necessary
-		if (coord[0] == self._upperLeft[0] and coord[1] < self._upperLeft[1]) or coord[0] < self._upperLeft[0]:
-			self.upperLeft = coord
-		elif (coord[0] == self._lowerRight[0] and coord[1] > self._lowerRight[1]) or coord[0] > self._lowerRight[0]:
-			self._lowerRight = coord
-
-		return True
-
-	def delete(self, coord):
-		"""
-		Remove an x, y coordinate, returning True on success
-		
-		Fails to remove if the coordinate dosn't exist
-		Fails to remove if the removal causes the room to become non-contiguous
-		"""
-		try:
-			x, y = self.exists({'coord': coord})
-
-			# Remove the coordinate
-			if y == coord[1]:
-				# Start the segment after @coord
-				if self._members[x][y] > 0:
-					self._members[x][y + 1] = self._members[x][y] - 1
-
-				del self._members[x][y]
-			elif coord[1] < y + self._members[x][y]:
-				# Split the segment in two
-				self._members[coord[0]][coord[1] + 1] = y + self._members[x][y] - coord[1]
-				self._members[x][y] = coord[1] - y
-			else:
-				# Reduce the segment length by 1
-				self._members[x][y] -= 1
-
-			if len(self._members[x]) = 0:
-				del self._members[x]
-
-			# Put the coordinate back if the room becomes non-contiguous
-			if self.isContiguous():
-				return True
-			else:
-				return not self.insert(coord)
-		except TypeError:
-			# Not in the room
-			return False
-
-
-	'''
-	Representations
-	'''
-	def render(self, dungeon):
-		"""
-		Draw the room on a target dungeon grid
-		"""
-		pass
-
-	def __str__(self):
-		"""
-		Draw the room in ASCII as if there were nothing else around it
-		"""
-		out = []
-
-		glMin, glMax = None, None
-		locMin, locMax = None, None
-
-		for x in range(self._upperLeft[0], self._lowerRight[0] + 1):
-			col = ''
-			for y in self._members[x]:
-				if not locMin:
-					locMin = y
-					col += Room.symbol * self._members[x][y]
-					locMax = y + self._members[x][y]
-				elif y < locMin:
-					col = Room.symbol * self._members[x][y] + ' ' * (locMin - self._members[x][y] - 1) + col
-					locMin = y
-				else:
-					col += ' ' * (y - locMax - 1) + Room.symbol * self._members[x][y]
-					locMax += (y - locMax - 1) + self._members[x][y]
-			
-			if not glMin:
-				glMin = locMin
-			elif glMin > locMin:
-				out = [' ' * len(out[0]) for i in range(0, glMin - locMin + 1)].extend(out)
-				glMin = locMin
-			
-			if not glMax:
-				glMax = locMax
-			elif glMax < locMax:
-				out.extend([' ' * len(out[0]) for i in range(0, locMax - glMax + 1)])
-				glMax = locMax
-			
-			if len(out) == 0:
-				out = [c for c in col]
-			else:
-				for c in range(0, len(col)):
-					out[c] += col[c]
-			
-			locMin, locMax = None, None
-
-		return out
\ No newline at end of file
+from bisect import bisect_left, bisect_right
+from collections import deque
+
+from Dungeon.Components.CardinalDirection import Direction
+from Dungeon.Components.Symbols import CODES
+from Dungeon.Components.UnionFind import UnionFind
+
+
+'''
+A Room in the dungeon
+
+Hidden properties define the room's structure
+	@_columns maps an x-coordinate to three lists, the first and last y-coordinate and the label of every segment of cells in that column, sorted top to bottom
+	@_upperLeft and @_lowerRight are the corners of the room's bounding box, or None for an empty room
+
+Contiguity is tracked with a union-find over segment labels
+	Segments with the same label are known to be connected; a segment keeps its label as it grows, and both halves keep it when it splits
+	@_labels is the union-find over labels, @_components the number of separate pieces
+
+Inserts cost a few bisects and unions; deletes cost a bisect plus the contiguity check, which settles most cells by looking at the eight cells around them or a small box around them
+A delete that does cut the room, or whose way round is long, searches segment by segment as far as the smallest piece it would leave, so carving a room down at random slows as it gets porous
+'''
+class Room():
+	symbol = 'R'
+
+	# How far around a removed cell delete() looks for a way round before searching the whole room
+	REACH = 4
+
+
+	'''
+	Constructors
+	'''
+	def __init__(self):
+		"""
+		Create a room with no coordinates in it
+		"""
+		self._columns = {}
+		self._upperLeft = None
+		self._lowerRight = None
+		self._size = 0
+
+		self._labels = UnionFind()
+		self._components = 0
+
+	@classmethod
+	def createRect(cls, upperLeft, lowerRight):
+		"""
+		Create a rectangular room
+		"""
+		r = Room()
+
+		r._upperLeft = tuple(upperLeft)
+		r._lowerRight = tuple(lowerRight)
+		r._size = (lowerRight[0] - upperLeft[0] + 1) * (lowerRight[1] - upperLeft[1] + 1)
+
+		# Every column is one segment, and the whole room is one piece
+		r._labels.add()
+		r._components = 1
+
+		for x in range(upperLeft[0], lowerRight[0] + 1):
+			r._columns[x] = ([upperLeft[1]], [lowerRight[1]], [0])
+
+		return r
+
+	@classmethod
+	def fromSegments(cls, segments):
+		"""
+		Create a room from column segments (x, first y, last y), as given by segments()
+
+		Segments in the same column may not overlap or touch
+		"""
+		segments = [tuple(segment) for segment in segments]
+
+		# One segment per column, all alike, side by side, is a rectangle
+		if len(segments) > 0 and len(set([segment[1:] for segment in segments])) == 1 and [segment[0] for segment in segments] == list(range(segments[0][0], segments[0][0] + len(segments))):
+			return cls.createRect((segments[0][0], segments[0][1]), (segments[-1][0], segments[0][2]))
+
+		r = Room()
+
+		for x, first, last in segments:
+			r._addSegment(x, first, last)
+
+		return r
+
+	@classmethod
+	def fromFile(cls, filename):
+		"""
+		Create a room from a file containing the room representation
+
+		Cells are read in any order, so the room may only become contiguous once the whole file is in; check isContiguous() afterwards
+		"""
+		r = Room()
+
+		with open(filename, 'r', encoding = 'utf-8') as f:
+			for lineCount, line in enumerate(f.read().splitlines()):
+				for charCount, c in enumerate(line):
+					if c == Room.symbol:
+						r._add((charCount, lineCount))
+
+		return r
+
+
+	'''
+	Operations on rooms
+	'''
+	def __len__(self):
+		return self._size
+
+	def exists(self, **kwargs):
+		"""
+		Check if a coordinate exists in the room
+
+		On True, return the location of its segment (x, first y of the segment) as a tuple
+		On False, return None
+		"""
+		if 'coord' in kwargs:
+			x, y = kwargs['coord']
+		else:
+			x, y = kwargs['x'], kwargs['y']
+
+		segment = self._segmentAt(x, y)
+		return None if segment == None else (x, segment[0])
+
+	def isContiguous(self):
+		"""
+		Check that there is a path between every pair of cells in the room
+		"""
+		# Blank rooms are vacuously contiguous
+		return self._components <= 1
+
+	def bounds(self):
+		"""
+		Upper left and lower right corners of the bounding box, or None for an empty room
+		"""
+		if self._upperLeft == None and self._size > 0:
+			xs = list(self._columns)
+			self._upperLeft = (min(xs), min([starts[0] for starts, ends, labels in self._columns.values()]))
+			self._lowerRight = (max(xs), max([ends[-1] for starts, ends, labels in self._columns.values()]))
+
+		return None if self._size == 0 else (self._upperLeft, self._lowerRight)
+
+	def segments(self):
+		"""
+		Every segment as (x, first y, last y), column by column
+		"""
+		for x in sorted(self._columns):
+			starts, ends, labels = self._columns[x]
+			for i in range(0, len(starts)):
+				yield (x, starts[i], ends[i])
+
+	def rows(self):
+		"""
+		Every run of cells along a row as (y, first x, last x), row by row
+		"""
+		xs = {}
+		for x, first, last in self.segments():
+			for y in range(first, last + 1):
+				xs.setdefault(y, []).append(x)
+
+		# Columns come out of segments() in order, so every row's xs are sorted
+		for y in sorted(xs):
+			row = xs[y]
+			start = row[0]
+
+			for i in range(1, len(row) + 1):
+				if i == len(row) or row[i] != row[i - 1] + 1:
+					yield (y, start, row[i - 1])
+
+					if i < len(row):
+						start = row[i]
+
+	def insert(self, coord):
+		"""
+		Insert an x, y coordinate, returning True on success
+
+		Fails to insert if the coordinate is already in the room
+		Fails to insert if the room becomes non-contiguous
+		"""
+		coord = tuple(coord)
+
+		# Already in the room
+		if not self.exists(coord = coord) == None:
+			return False
+
+		# An insert causes a non-contiguous room if the new @coord is not adjacent to anything already in the room
+		if self._size > 0 and not any([not self.exists(coord = Direction.step(coord, d)) == None for d in Direction.CARDINALS]):
+			return False
+
+		self._add(coord)
+		return True
+
+	def delete(self, coord):
+		"""
+		Remove an x, y coordinate, returning True on success
+
+		Fails to remove if the coordinate dosn't exist
+		Fails to remove if the removal causes the room to become non-contiguous
+		"""
+		coord = tuple(coord)
+
+		# Not in the room
+		if self.exists(coord = coord) == None:
+			return False
+
+		label = self._removeCell(coord)
+
+		# Put the coordinate back if the room splits apart without it
+		neighbours = [n for n in [Direction.step(coord, d) for d in Direction.CARDINALS] if not self._segmentAt(*n) == None]
+		if not self._staysConnected(coord, neighbours):
+			self._insertCell(coord, label)
+			return False
+
+		# Labels never split: whatever the cell joined is still connected without it
+		self._size -= 1
+
+		if len(neighbours) == 0:
+			# It was a piece of its own
+			self._components -= 1
+
+		# Shrink the bounding box lazily
+		if self._size == 0 or (self._upperLeft != None and (coord[0] in (self._upperLeft[0], self._lowerRight[0]) or coord[1] in (self._upperLeft[1], self._lowerRight[1]))):
+			self._upperLeft, self._lowerRight = None, None
+
+		return True
+
+
+	'''
+	Representations
+	'''
+	def render(self, dungeon):
+		"""
+		Draw the room on a target dungeon grid, writing each column segment with one strided slice assignment
+
+		Raises ValueError if the room does not fit inside the grid, since a column past the edge would wrap into the next row
+		"""
+		code = CODES[Room.symbol]
+		cells, xDim = dungeon.cells, dungeon.xDim
+
+		if self._size > 0:
+			upperLeft, lowerRight = self.bounds()
+			if upperLeft[0] < 0 or upperLeft[1] < 0 or lowerRight[0] >= xDim or lowerRight[1] >= dungeon.yDim:
+				raise ValueError('Room spanning {} to {} does not fit in a {} x {} grid'.format(upperLeft, lowerRight, xDim, dungeon.yDim))
+
+		for x, first, last in self.segments():
+			cells[first * xDim + x:last * xDim + x + 1:xDim] = bytes([code]) * (last - first + 1)
+
+	def __str__(self):
+		"""
+		Draw the room in ASCII as if there were nothing else around it
+		"""
+		if self._size == 0:
+			return ''
+
+		upperLeft, lowerRight = self.bounds()
+		width = lowerRight[0] - upperLeft[0] + 1
+		out = [[' '] * width for y in range(upperLeft[1], lowerRight[1] + 1)]
+
+		for x, first, last in self.segments():
+			for y in range(first, last + 1):
+				out[y - upperLeft[1]][x - upperLeft[0]] = Room.symbol
+
+		return '\n'.join([''.join(row) for row in out])
+
+
+	'''
+	Helpers
+	'''
+	def _add(self, coord):
+		"""
+		Insert a cell that is not in the room yet, without any contiguity check
+		"""
+		x, y = coord
+		fresh = len(self._labels)
+		label = self._insertCell(coord, fresh)
+		self._size += 1
+
+		# A cell that starts a segment of its own is a new piece until it is joined with its neighbours
+		if label == fresh:
+			self._labels.add()
+			self._components += 1
+
+		for nx in (x - 1, x + 1):
+			for first, last, other in self._overlapping(nx, y, y):
+				self._union(label, other)
+
+		self._grow(coord, coord)
+
+	def _addSegment(self, x, first, last):
+		"""
+		Insert a whole column segment that neither overlaps nor touches the segments already in its column, without any contiguity check
+		"""
+		starts, ends, labels = self._columns.setdefault(x, ([], [], []))
+		i = bisect_right(starts, first)
+
+		if (i > 0 and ends[i - 1] >= first - 1) or (i < len(starts) and starts[i] <= last + 1):
+			raise ValueError('Segment ({}, {}, {}) overlaps or touches another in its column'.format(x, first, last))
+
+		label = self._labels.add()
+		self._components += 1
+
+		starts.insert(i, first)
+		ends.insert(i, last)
+		labels.insert(i, label)
+		self._size += last - first + 1
+
+		for nx in (x - 1, x + 1):
+			for otherFirst, otherLast, other in self._overlapping(nx, first, last):
+				self._union(label, other)
+
+		self._grow((x, first), (x, last))
+
+	def _grow(self, upperLeft, lowerRight):
+		"""
+		Stretch a known bounding box over new cells
+		"""
+		if self._upperLeft != None:
+			self._upperLeft = (min(self._upperLeft[0], upperLeft[0]), min(self._upperLeft[1], upperLeft[1]))
+			self._lowerRight = (max(self._lowerRight[0], lowerRight[0]), max(self._lowerRight[1], lowerRight[1]))
+		elif self._size == lowerRight[1] - upperLeft[1] + 1:
+			self._upperLeft, self._lowerRight = upperLeft, lowerRight
+
+	def _segmentAt(self, x, y):
+		"""
+		The segment holding (@x, @y) as (first y, last y, label), or None
+		"""
+		if x in self._columns:
+			starts, ends, labels = self._columns[x]
+			i = bisect_right(starts, y) - 1
+
+			if i > -1 and ends[i] >= y:
+				return (starts[i], ends[i], labels[i])
+
+		return None
+
+	def _overlapping(self, x, first, last):
+		"""
+		Every segment of column @x sharing a row with @first to @last, as (first y, last y, label)
+		"""
+		if x in self._columns:
+			starts, ends, labels = self._columns[x]
+
+			# Segments are disjoint, so their ends are sorted too
+			for i in range(bisect_left(ends, first), bisect_right(starts, last)):
+				yield (starts[i], ends[i], labels[i])
+
+	def _insertCell(self, coord, label):
+		"""
+		Add a cell to its column's segments, merging with the segments above and below
+
+		Returns the label of the segment the cell ends up in, which is @label if it starts a segment of its own
+		"""
+		x, y = coord
+		starts, ends, labels = self._columns.setdefault(x, ([], [], []))
+		i = bisect_right(starts, y)
+
+		joinsAbove = i > 0 and ends[i - 1] == y - 1
+		joinsBelow = i < len(starts) and starts[i] == y + 1
+
+		if joinsAbove and joinsBelow:
+			ends[i - 1] = ends[i]
+			self._union(labels[i - 1], labels[i])
+			del starts[i], ends[i], labels[i]
+			return labels[i - 1]
+		elif joinsAbove:
+			ends[i - 1] = y
+			return labels[i - 1]
+		elif joinsBelow:
+			starts[i] = y
+			return labels[i]
+
+		starts.insert(i, y)
+		ends.insert(i, y)
+		labels.insert(i, label)
+		return label
+
+	def _removeCell(self, coord):
+		"""
+		Remove a cell from its column's segments, splitting its segment if needed
+
+		Returns the label of the segment the cell was in; both halves of a split segment keep it
+		"""
+		x, y = coord
+		starts, ends, labels = self._columns[x]
+		i = bisect_right(starts, y) - 1
+		label = labels[i]
+
+		if starts[i] == ends[i]:
+			del starts[i], ends[i], labels[i]
+		elif starts[i] == y:
+			starts[i] = y + 1
+		elif ends[i] == y:
+			ends[i] = y - 1
+		else:
+			starts.insert(i + 1, y + 1)
+			ends.insert(i + 1, ends[i])
+			labels.insert(i + 1, label)
+			ends[i] = y - 1
+
+		if len(starts) == 0:
+			del self._columns[x]
+
+		return label
+
+	def _union(self, a, b):
+		if self._labels.union(a, b):
+			self._components -= 1
+
+	def _staysConnected(self, coord, neighbours):
+		"""
+		Check that the cells in @neighbours are still connected to each other now that @coord is gone
+		"""
+		if len(neighbours) < 2:
+			return True
+
+		# Walk the 8 cells around @coord: neighbours on the same unbroken arc are joined through the corners
+		ring = [Direction.step(coord, d) for d in (Direction.N, Direction.NE, Direction.E, Direction.SE, Direction.S, Direction.SW, Direction.W, Direction.NW)]
+		present = [not self._segmentAt(*c) == None for c in ring]
+
+		if not all(present):
+			gap = present.index(False)
+			arcs, arc = set(), 0
+
+			for i in range(gap, gap + 8):
+				if not present[i % 8]:
+					arc += 1
+				elif ring[i % 8] in neighbours:
+					arcs.add(arc)
+
+			if len(arcs) == 1:
+				return True
+		else:
+			return True
+
+		# Most cuts are bridged close by, around the hole the cell borders, so look in a small box around @coord first
+		joined = self._joinedNearby(coord, neighbours, Room.REACH)
+		if not joined == None:
+			return joined
+
+		# Otherwise search outwards from the segment of every neighbour at once, merging searches as they meet
+		# Stops as soon as all searches have met, or as soon as one of them runs out of segments, which means it is cut off
+		owner = {}
+		searches = []
+		for x, y in neighbours:
+			first, last, label = self._segmentAt(x, y)
+			owner[(x, first)] = len(searches)
+			searches.append(deque([(x, first, last)]))
+
+		group = list(range(0, len(searches)))
+		def root(i):
+			while group[i] != i:
+				i = group[i]
+			return i
+
+		live = len(searches)
+		while True:
+			for i in range(0, len(searches)):
+				if group[i] != i:
+					continue
+
+				if len(searches[i]) == 0:
+					return False
+
+				x, first, last = searches[i].popleft()
+				for nx in (x - 1, x + 1):
+					for nextFirst, nextLast, label in self._overlapping(nx, first, last):
+						nextSegment = (nx, nextFirst)
+						if nextSegment in owner:
+							other = root(owner[nextSegment])
+							if other != i:
+								# Merge the other search into this one
+								group[other] = i
+								searches[i].extend(searches[other])
+								searches[other].clear()
+
+								live -= 1
+								if live == 1:
+									return True
+						else:
+							owner[nextSegment] = i
+							searches[i].append((nx, nextFirst, nextLast))
+
+	def _joinedNearby(self, coord, neighbours, reach):
+		"""
+		Search from the first of @neighbours without leaving the box within @reach cells of @coord
+
+		True if it meets all the other neighbours, False if it ran out of cells without ever touching the box, so the rest are cut off, and None if the box was too small to tell
+		"""
+		left, top, right, bottom = coord[0] - reach, coord[1] - reach, coord[0] + reach, coord[1] + reach
+
+		targets = set(neighbours[1:])
+		seen = set(neighbours[:1])
+		queue = deque(neighbours[:1])
+		clipped = False
+
+		while len(queue) > 0:
+			x, y = queue.popleft()
+			for nextCell in ((x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)):
+				if nextCell in seen or self._segmentAt(*nextCell) == None:
+					continue
+
+				if nextCell[0] < left or nextCell[0] > right or nextCell[1] < top or nextCell[1] > bottom:
+					clipped = True
+					continue
+
+				seen.add(nextCell)
+				queue.append(nextCell)
+
+				targets.discard(nextCell)
+				if len(targets) == 0:
+					return True
+
+		return None if clipped else False
\ No newline at end of file
@@ -0,0 +1,111 @@
+import re
+
+from Dungeon.Components.Symbols import SYMBOLS, PASSABLE
+
+
+# Translation tables from cell codes to binary digits
+_FREE = bytes([ord('1') if code == 0 else ord('0') for code in range(256)])
+_ROCK = bytes([ord('1') if code != 0 and not (code < len(SYMBOLS) and SYMBOLS[code] in PASSABLE) else ord('0') for code in range(256)])
+
+
+'''
+A two-state cellular automaton over a whole dungeon grid, held as one big integer
+
+Every cell is one bit, set when the cell is rock; rows are laid out @_stride = x_dim + 1 bits apart, and one guard row above and below plus the guard bit after every row count as rock
+The layout starts with one more guard bit, so the upper-left neighbour of (0, 0) is bit 0 rather than falling off the end of the integer
+That way the 8 neighbours of every cell are the whole grid shifted by 1, stride - 1, stride and stride + 1 either way, and one generation is a few dozen integer operations no matter the size
+	@_free holds the cells the automaton may change (DEFAULT cells), every other cell keeps its state
+	@_fixed holds the cells that are rock and stay rock (anything already on the grid that is not passable)
+'''
+class Automaton(object):
+	def __init__(self, grid):
+		self._xDim = grid.xDim
+		self._yDim = grid.yDim
+		self._stride = grid.xDim + 1
+		self._size = (grid.yDim + 2) * self._stride + 1
+
+		self._all = (1 << self._size) - 1
+		self._inside = self._bits(b'1' * (grid.xDim * grid.yDim))
+		self._free = self._bits(grid.read().translate(_FREE))
+		self._fixed = self._bits(grid.read().translate(_ROCK))
+
+		self.alive = self._fixed
+
+	def randomize(self, rng, fill):
+		"""
+		Make every free cell rock with probability @fill, drawing all the cells from @rng at once
+		"""
+		cutoff = round(fill * 256)
+		table = bytes([ord('1') if b < cutoff else ord('0') for b in range(256)])
+
+		self.alive = (self._bits(rng.randbytes(self._xDim * self._yDim).translate(table)) & self._free) | self._fixed
+
+	def step(self, birth, survive):
+		"""
+		Run one generation: open cells with a number of rock neighbours in @birth turn to rock, rock cells stay rock with a number in @survive
+		"""
+		stride = self._stride
+		a = (self.alive & self._inside) | (self._all ^ self._inside)
+
+		# Add up the 8 shifted grids into a 4-bit counter per cell, one bit plane per counter bit
+		b0, b1, b2, b3 = 0, 0, 0, 0
+		for n in (a >> 1, a << 1, a >> stride, a << stride, a >> (stride - 1), a << (stride - 1), a >> (stride + 1), a << (stride + 1)):
+			c0 = b0 & n
+			b0 ^= n
+			c1 = b1 & c0
+			b1 ^= c0
+			c2 = b2 & c1
+			b2 ^= c1
+			b3 |= c2
+
+		planes = [(b0, b0 ^ self._all), (b1, b1 ^ self._all), (b2, b2 ^ self._all), (b3, b3 ^ self._all)]
+		def count(k):
+			out = self._all
+			for bit in range(0, 4):
+				out &= planes[bit][0] if (k >> bit) & 1 else planes[bit][1]
+			return out
+
+		born, kept = 0, 0
+		for k in set(birth):
+			born |= count(k)
+		for k in set(survive):
+			kept |= count(k)
+
+		self.alive = ((self.alive & kept) | ((self.alive ^ self._all) & born)) & self._free | self._fixed
+
+	def paint(self, grid, rock, floor):
+		"""
+		Write the free cells back to @grid as the codes @rock and @floor, one slice per run of free cells
+		"""
+		stride = self._stride
+		alive = format(self.alive & self._free, '0{}b'.format(self._size))[::-1].encode('ascii')
+		free = format(self._free, '0{}b'.format(self._size))[::-1].encode('ascii')
+		table = bytes([rock if b == ord('1') else floor for b in range(256)])
+
+		for y in range(0, self._yDim):
+			start = (y + 1) * stride + 1
+			row = alive[start:start + self._xDim].translate(table)
+
+			for run in re.finditer(b'1+', free[start:start + self._xDim]):
+				grid.cells[y * self._xDim + run.start():y * self._xDim + run.end()] = row[run.start():run.end()]
+
+	def openCount(self):
+		"""
+		Number of free cells that are not rock
+		"""
+		return self._free.bit_count() - (self.alive & self._free).bit_count()
+
+
+	'''
+	Helpers
+	'''
+	def _bits(self, digits):
+		"""
+		Big integer from one binary digit per grid cell, row-major, with the guard bits clear
+		"""
+		xDim, stride = self._xDim, self._stride
+		if xDim == 0:
+			return 0
+
+		padded = b'0' * (stride + 1) + b''.join([digits[y * xDim:(y + 1) * xDim] + b'0' for y in range(0, self._yDim)]) + b'0' * stride
+		return int(padded[::-1], 2)
\ No newline at end of file
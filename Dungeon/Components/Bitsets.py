@@ -0,0 +1,29 @@
+import re
+
+from Dungeon.Components.Symbols import SYMBOLS
+
+
+'''
+Helpers for reading a grid through translation tables and bitsets
+
+A translation table maps every cell code to a flag, so one bytes.translate turns a run of cells into flags
+A bitset is a big integer with bit i set for cell i, walked through its binary digits
+'''
+def table(symbols, on = 1, off = 0):
+	"""
+	Translation table from cell codes to @on for the codes of @symbols and @off for every other code
+	"""
+	return bytes([on if code < len(SYMBOLS) and SYMBOLS[code] in symbols else off for code in range(256)])
+
+def digits(symbols):
+	"""
+	Translation table from cell codes to the ASCII binary digit '1' for the codes of @symbols and '0' for every other code, ready for int(..., 2)
+	"""
+	return table(symbols, ord('1'), ord('0'))
+
+def setBits(bits):
+	"""
+	Index of every set bit of @bits, least significant first
+	"""
+	for bit in re.finditer('1', bin(bits)[:1:-1]):
+		yield bit.start()
\ No newline at end of file
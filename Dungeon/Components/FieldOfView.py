@@ -0,0 +1,208 @@
+from collections import OrderedDict
+
+from Dungeon.Components.Bitsets import table, setBits
+from Dungeon.Components.CardinalDirection import Direction
+from Dungeon.Components.Symbols import WALL
+
+
+'''
+Field of view over a dungeon grid, by recursive shadowcasting
+
+The view around an origin is cast in eight octants, each one a pair of Direction codes: rows step away from the origin in the first, cells along a row step sideways in the second
+Cells holding an opaque symbol, and everything out of bounds, block sight; blocking cells that are lit are visible themselves
+A view is returned as a bitset over the whole grid, bit y * x_dim + x set for every visible cell
+
+Views are cached per (origin, radius), least recently used first, and a write reported through invalidate() only drops the views that could see the cell
+	@_opaque holds 1 for every opaque cell
+	@_views maps (origin, radius) to (first flat index of the view's rows, bitset of the view relative to that index), so cached views stay as small as their rows
+'''
+class FieldOfView(object):
+	# Every (row direction, sideways direction) pair, covering all the cells around an origin between them
+	OCTANTS = tuple([(primary, side) for primary in Direction.CARDINALS for side in Direction.CARDINALS if side != primary and side != Direction.OPPOSITE[primary]])
+
+	def __init__(self, grid, opaque = (WALL,), maxViews = 1024):
+		self._grid = grid
+		self._xDim = grid.xDim
+		self._yDim = grid.yDim
+		self._maxViews = max(maxViews, 1)
+
+		self._table = table(opaque)
+		self._opaque = bytearray(grid.read().translate(self._table))
+
+		self._views = OrderedDict()
+		self._hits, self._misses = 0, 0
+
+
+	'''
+	Queries
+	'''
+	def visible(self, origin, radius = None):
+		"""
+		Bitset of every cell visible from @origin within @radius cells (as the crow flies), or without limit when @radius is None
+		"""
+		offset, bits = self._view(tuple(origin), radius)
+		return bits << offset
+
+	def many(self, origins, radius = None):
+		"""
+		Bitsets of the views from every origin in @origins, in the same order
+		"""
+		return [self.visible(origin, radius) for origin in origins]
+
+	def anyVisible(self, origins, radius = None):
+		"""
+		Bitset of every cell seen from at least one of @origins
+		"""
+		out = 0
+		for origin in origins:
+			offset, bits = self._view(tuple(origin), radius)
+			out |= bits << offset
+
+		return out
+
+	def sees(self, origin, coord, radius = None):
+		"""
+		Check if @coord can be seen from @origin
+		"""
+		if not self._grid.inBounds(coord):
+			return False
+
+		offset, bits = self._view(tuple(origin), radius)
+		i = coord[1] * self._xDim + coord[0] - offset
+		return i > -1 and (bits >> i) & 1 == 1
+
+	def cells(self, bits):
+		"""
+		Coordinates of every cell set in the bitset @bits, in row-major order
+		"""
+		for i in setBits(bits):
+			yield (i % self._xDim, i // self._xDim)
+
+
+	'''
+	Changes to the grid
+	'''
+	def invalidate(self, coord = None):
+		"""
+		Re-read @coord from the grid, dropping every cached view that can see it if it became opaque or clear, or re-read the whole grid when no @coord is given
+		"""
+		if coord == None:
+			self._opaque = bytearray(self._grid.read().translate(self._table))
+			self._views.clear()
+			return
+
+		i = coord[1] * self._xDim + coord[0]
+		opaque = self._table[self._grid.cells[i]]
+
+		if opaque == self._opaque[i]:
+			return
+
+		self._opaque[i] = opaque
+
+		# A cell nobody could see cannot change what anybody sees
+		for key in list(self._views):
+			offset, bits = self._views[key]
+			if i >= offset and (bits >> (i - offset)) & 1:
+				del self._views[key]
+
+	def stats(self):
+		return {
+			'hits': self._hits,
+			'misses': self._misses,
+			'views': len(self._views)
+		}
+
+
+	'''
+	Helpers
+	'''
+	def _view(self, origin, radius):
+		key = (origin, radius)
+
+		if key in self._views:
+			self._views.move_to_end(key)
+			self._hits += 1
+			return self._views[key]
+
+		self._misses += 1
+		view = self._cast(origin, radius)
+
+		self._views[key] = view
+		while len(self._views) > self._maxViews:
+			self._views.popitem(last = False)
+
+		return view
+
+	def _cast(self, origin, radius):
+		"""
+		Shadowcast all eight octants, marking visible cells in a bitmap of only the rows the view can reach
+		"""
+		xDim, yDim = self._xDim, self._yDim
+		ox, oy = origin
+
+		if not self._grid.inBounds(origin):
+			return (0, 0)
+
+		reach = max(xDim, yDim) if radius == None else radius
+		top, bottom = max(0, oy - reach), min(yDim - 1, oy + reach)
+		offset = top * xDim
+
+		seen = bytearray(((bottom - top + 1) * xDim + 7) // 8)
+		i = oy * xDim + ox - offset
+		seen[i >> 3] |= 1 << (i & 7)
+
+		for primary, side in FieldOfView.OCTANTS:
+			self._octant(seen, offset, origin, reach, Direction.OFFSET[primary], Direction.OFFSET[side], 1, 1.0, 0.0)
+
+		return (offset, int.from_bytes(seen, 'little'))
+
+	def _octant(self, seen, offset, origin, reach, primary, side, row, start, end):
+		"""
+		Light the octant between slopes @start and @end (sideways cells per row), from @row outwards, recursing past every run of blocking cells
+		"""
+		if start < end:
+			return
+
+		xDim, yDim, opaque = self._xDim, self._yDim, self._opaque
+		ox, oy = origin
+		(px, py), (sx, sy) = primary, side
+		limit = reach * reach if reach < max(xDim, yDim) else xDim * xDim + yDim * yDim
+		restart = start
+
+		for j in range(row, reach + 1):
+			blocked = False
+
+			# Only the columns between the two slopes can be lit; one column of slack either side leaves the exact edge tests below to decide
+			first = min(j, int(start * (j + 0.5) + 0.5) + 1)
+			last = max(0, int(end * (j - 0.5) - 0.5) - 1)
+
+			for c in range(first, last - 1, -1):
+				# Slopes of the far and near edges of the cell
+				left, right = (c + 0.5) / (j - 0.5), (c - 0.5) / (j + 0.5)
+
+				if start < right:
+					continue
+				if end > left:
+					break
+
+				x, y = ox + j * px + c * sx, oy + j * py + c * sy
+				inside = x > -1 and x < xDim and y > -1 and y < yDim
+
+				if inside and c * c + j * j <= limit:
+					i = y * xDim + x - offset
+					seen[i >> 3] |= 1 << (i & 7)
+
+				if blocked:
+					if not inside or opaque[y * xDim + x]:
+						restart = right
+						continue
+
+					blocked = False
+					start = restart
+				elif (not inside or opaque[y * xDim + x]) and j < reach:
+					blocked = True
+					self._octant(seen, offset, origin, reach, primary, side, j + 1, start, left)
+					restart = right
+
+			if blocked:
+				break
\ No newline at end of file
@@ -0,0 +1,134 @@
+from Dungeon.Components.Bitsets import digits
+from Dungeon.Components.Symbols import SYMBOLS, CODES, DEFAULT
+
+
+# Translation tables between symbols and latin-1 decoded codes
+_DECODE = {code: symbol for code, symbol in enumerate(SYMBOLS)}
+_ENCODE = {ord(symbol): code for code, symbol in enumerate(SYMBOLS)}
+
+
+'''
+A compact dungeon grid
+
+Cells are stored row-major in a flat bytearray, one byte per cell, holding the code of the cell's symbol
+	@cells[y * xDim + x] is the code at (x, y)
+
+A grid can also wrap any other writable buffer (a memory-mapped file, shared memory) without copying it, in which case @cells is a memoryview
+'''
+class Grid(object):
+	def __init__(self, x_dim, y_dim, fill = DEFAULT):
+		self.xDim = x_dim
+		self.yDim = y_dim
+
+		self.cells = bytearray([CODES[fill]]) * (x_dim * y_dim)
+
+	@classmethod
+	def fromRows(cls, rows):
+		"""
+		Create a grid from equal-length rows of symbols, one row per y coordinate
+		"""
+		grid = cls(len(rows[0]) if len(rows) > 0 else 0, len(rows))
+		if any([len(row) != grid.xDim for row in rows]):
+			raise ValueError('Rows must be equal length')
+
+		# Characters without a code would pass through translate unchanged, so check them before encoding
+		text = ''.join(rows)
+		unknown = set(text).difference(SYMBOLS)
+		if len(unknown) > 0:
+			raise ValueError('Rows may only contain dungeon symbols, not {}'.format(', '.join(sorted([repr(c) for c in unknown]))))
+
+		grid.cells[:] = text.translate(_ENCODE).encode('latin-1')
+		return grid
+
+	@classmethod
+	def fromBuffer(cls, x_dim, y_dim, buffer):
+		"""
+		Wrap the first x_dim * y_dim bytes of @buffer as the cells of a grid, without copying
+		"""
+		view = memoryview(buffer).cast('B')
+		if len(view) < x_dim * y_dim:
+			raise ValueError('Buffer is too small for a {} x {} grid'.format(x_dim, y_dim))
+
+		grid = cls.__new__(cls)
+		grid.xDim = x_dim
+		grid.yDim = y_dim
+
+		# A bytearray of the right size is already what a grid would hold
+		grid.cells = buffer if isinstance(buffer, bytearray) and len(buffer) == x_dim * y_dim else view[:x_dim * y_dim]
+
+		return grid
+
+
+	'''
+	Cell access
+	'''
+	def index(self, coord):
+		"""
+		Flat index of an x, y coordinate
+		"""
+		return coord[1] * self.xDim + coord[0]
+
+	def inBounds(self, coord):
+		return coord[0] > -1 and coord[0] < self.xDim and coord[1] > -1 and coord[1] < self.yDim
+
+	def get(self, coord):
+		return SYMBOLS[self.cells[coord[1] * self.xDim + coord[0]]]
+
+	def set(self, coord, symbol):
+		self.cells[coord[1] * self.xDim + coord[0]] = CODES[symbol]
+
+
+	'''
+	Whole-grid operations
+	'''
+	def fill(self, upperLeft, lowerRight, symbol):
+		"""
+		Set every cell in the inclusive rectangle to @symbol, one slice assignment per row
+		"""
+		width = lowerRight[0] - upperLeft[0] + 1
+		span = bytes([CODES[symbol]]) * width
+
+		for y in range(upperLeft[1], lowerRight[1] + 1):
+			start = y * self.xDim + upperLeft[0]
+			self.cells[start:start + width] = span
+
+	def read(self, start = 0, end = None):
+		"""
+		Codes of the flat index range [start, end) as bytes or a bytearray, whatever the backing buffer
+		"""
+		data = self.cells[start:end]
+		return data if isinstance(data, bytearray) else bytes(data)
+
+	def view(self):
+		"""
+		The cells as a flat memoryview of codes, without copying
+		"""
+		return memoryview(self.cells).cast('B')
+
+	def count(self, symbol):
+		return self.read().count(CODES[symbol])
+
+	def bits(self, symbols):
+		"""
+		One bitset per row, bit x set when (x, y) holds one of @symbols
+		"""
+		table = digits(symbols)
+
+		if self.xDim == 0:
+			return [0] * self.yDim
+
+		return [int(self.read(y * self.xDim, (y + 1) * self.xDim).translate(table)[::-1], 2) for y in range(0, self.yDim)]
+
+	def row(self, y, start = 0, end = None):
+		"""
+		The symbols in row @y as a string, from column @start up to but not including column @end
+		"""
+		end = self.xDim if end == None else min(end, self.xDim)
+		return self.read(y * self.xDim + start, y * self.xDim + end).decode('latin-1').translate(_DECODE)
+
+	def __str__(self):
+		if self.xDim == 0:
+			return '\n' * self.yDim
+
+		out = self.read().decode('latin-1').translate(_DECODE)
+		return ''.join([out[i:i + self.xDim] + '\n' for i in range(0, len(out), self.xDim)])
\ No newline at end of file
@@ -0,0 +1,66 @@
+from Dungeon.Components.CardinalDirection import Direction
+from Dungeon.Components.Symbols import CODES, WALL
+
+
+# Translation tables from codes to 1 for occupied cells (anything but DEFAULT) and for features (anything but DEFAULT or WALL)
+_OCCUPIED = bytes([0 if code == 0 else 1 for code in range(256)])
+_FEATURE = bytes([0 if code in (0, CODES[WALL]) else 1 for code in range(256)])
+
+
+'''
+Neighbour occupancy of every cell of a dungeon grid, one byte per cell
+
+The grid is copied into @codes with a border of WALL all around, so that every real cell has four neighbours and no step needs a bounds check; the border reads as occupied but never as a feature, just like out of bounds
+	@codes[p] is the code of the cell at padded index p = (y + 1) * @stride + x + 1
+	@masks[p] has bit (1 << d) set when the neighbour in direction d is occupied, and bit (16 << d) set when it is a feature
+
+Writers keep the masks up to date by OR-ing @occupied (for a WALL) or @feature (for anything else) into the four neighbours of every cell they fill
+'''
+class NeighbourMasks(object):
+	# Direction codes of the free neighbours for every mask, in Direction.CARDINALS order
+	OPEN = tuple([tuple([d for d in Direction.CARDINALS if not mask & (1 << d)]) for mask in range(256)])
+
+	# Feature bits ahead, to the left and to the right of a cell entered in each direction
+	AROUND = tuple([(1 << d | 1 << Direction.LEFT[d] | 1 << Direction.RIGHT[d]) << 4 for d in range(4)])
+
+	def __init__(self, grid):
+		self.xDim = grid.xDim
+		self.yDim = grid.yDim
+		self.stride = grid.xDim + 2
+
+		stride = self.stride
+		size = stride * (grid.yDim + 2)
+
+		self.codes = bytearray([CODES[WALL]]) * size
+		for y in range(0, grid.yDim):
+			self.codes[(y + 1) * stride + 1:(y + 1) * stride + 1 + grid.xDim] = grid.read(y * grid.xDim, (y + 1) * grid.xDim)
+
+		# Offset of the neighbour in every direction, by direction code
+		self.offsets = tuple([dy * stride + dx for dx, dy in Direction.OFFSET[:4]])
+
+		# Add up every neighbour's bit as one big integer per direction and kind; no byte can carry into the next as the sum is at most 255
+		total = 0
+		for table, shift in ((_OCCUPIED, 0), (_FEATURE, 4)):
+			flags = self.codes.translate(table)
+
+			for d in range(0, 4):
+				k = self.offsets[d]
+				shifted = flags[k:] + bytes(k) if k > 0 else bytes(-k) + flags[:k]
+				total += int.from_bytes(shifted, 'little') << (d + shift)
+
+		self.masks = bytearray(total.to_bytes(size, 'little'))
+
+		# Bits to OR into the neighbour in each direction when a cell is filled: that neighbour sees the cell in the opposite direction
+		self.occupied = tuple([1 << Direction.OPPOSITE[d] for d in range(4)])
+		self.feature = tuple([(16 | 1) << Direction.OPPOSITE[d] for d in range(4)])
+
+	def index(self, coord):
+		return (coord[1] + 1) * self.stride + coord[0] + 1
+
+	def paint(self, grid):
+		"""
+		Copy the cells back into @grid, one slice per row
+		"""
+		stride = self.stride
+		for y in range(0, self.yDim):
+			grid.cells[y * self.xDim:(y + 1) * self.xDim] = self.codes[(y + 1) * stride + 1:(y + 1) * stride + 1 + self.xDim]
\ No newline at end of file
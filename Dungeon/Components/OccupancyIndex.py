@@ -0,0 +1,129 @@
+from itertools import islice
+
+from Dungeon.Components.Bitsets import setBits
+
+
+# Translation table turning a row of codes into binary digits, DEFAULT (code 0) is free and everything else is occupied
+_BITS = bytes([ord('0')]) + bytes([ord('1')]) * 255
+
+
+'''
+Occupancy of a dungeon grid as one bitset per row
+
+Bit x of @_rows[y] is set when (x, y) is occupied, so testing or filling a rectangle costs one masked integer operation per row
+'''
+class OccupancyIndex(object):
+	def __init__(self, x_dim, y_dim):
+		self._xDim = x_dim
+		self._yDim = y_dim
+
+		self._rows = [0] * y_dim
+
+	@classmethod
+	def fromGrid(cls, grid):
+		"""
+		Index every non-DEFAULT cell of @grid
+		"""
+		index = cls(grid.xDim, grid.yDim)
+
+		if grid.xDim > 0:
+			for y in range(0, grid.yDim):
+				start = y * grid.xDim
+				index._rows[y] = int(grid.read(start, start + grid.xDim).translate(_BITS)[::-1], 2)
+
+		return index
+
+
+	'''
+	Queries and updates on inclusive rectangles
+	'''
+	def isFree(self, upperLeft, lowerRight, margin = 0):
+		"""
+		Check that no cell in the rectangle, grown by @margin on every side, is occupied
+
+		Rectangles reaching out of bounds are never free
+		"""
+		x0, y0 = upperLeft[0] - margin, upperLeft[1] - margin
+		x1, y1 = lowerRight[0] + margin, lowerRight[1] + margin
+
+		if x0 < 0 or y0 < 0 or x1 >= self._xDim or y1 >= self._yDim:
+			return False
+
+		mask = ((1 << (x1 - x0 + 1)) - 1) << x0
+		rows = self._rows
+
+		for y in range(y0, y1 + 1):
+			if rows[y] & mask:
+				return False
+
+		return True
+
+	def occupy(self, upperLeft, lowerRight):
+		"""
+		Mark every cell in the rectangle as occupied
+		"""
+		mask = ((1 << (lowerRight[0] - upperLeft[0] + 1)) - 1) << upperLeft[0]
+		rows = self._rows
+
+		for y in range(upperLeft[1], lowerRight[1] + 1):
+			rows[y] |= mask
+
+	def isOccupied(self, coord):
+		return (self._rows[coord[1]] >> coord[0]) & 1 == 1
+
+	'''
+	Free space search
+	'''
+	def corners(self, width, height, upperLeft, lowerRight):
+		"""
+		Find every upper-left corner at which a free @width x @height rectangle fits inside the bounds rectangle
+
+		Returns a list of (y, bits) pairs where bit x of bits is set when the rectangle with its corner at (x, y) is free
+		Rows without any corner are left out
+		"""
+		x0, y0 = max(upperLeft[0], 0), max(upperLeft[1], 0)
+		x1, y1 = min(lowerRight[0], self._xDim - 1), min(lowerRight[1], self._yDim - 1)
+
+		if width < 1 or height < 1 or x1 - x0 + 1 < width or y1 - y0 + 1 < height:
+			return []
+
+		full = (1 << self._xDim) - 1
+		bounds = ((1 << (x1 - x0 - width + 2)) - 1) << x0
+
+		# Horizontal runs: bit x stays set while x..x+span-1 are all free, doubling the span each step
+		runs = []
+		for y in range(y0, y1 + 1):
+			run, span = ~self._rows[y] & full, 1
+			while span < width:
+				step = min(span, width - span)
+				run &= run >> step
+				span += step
+			runs.append(run & bounds)
+
+		# Vertical runs over the horizontal ones, the same way
+		span = 1
+		while span < height:
+			step = min(span, height - span)
+			runs = [runs[i] & runs[i + step] for i in range(0, len(runs) - step)]
+			span += step
+
+		return [(y0 + i, bits) for i, bits in enumerate(runs) if bits]
+
+	@staticmethod
+	def sample(corners, rng):
+		"""
+		Uniformly pick one corner from the output of corners(), or None if there are none
+		"""
+		total = sum([bits.bit_count() for y, bits in corners])
+		if total == 0:
+			return None
+
+		k = rng.randrange(0, total)
+		for y, bits in corners:
+			count = bits.bit_count()
+			if k >= count:
+				k -= count
+				continue
+
+			# The kth set bit, least significant first
+			return (next(islice(setBits(bits), k, None)), y)
\ No newline at end of file
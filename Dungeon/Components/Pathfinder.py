@@ -0,0 +1,283 @@
+import heapq
+from array import array
+from collections import OrderedDict
+
+from Dungeon.Components.Bitsets import table
+from Dungeon.Components.CardinalDirection import Direction
+from Dungeon.Components.Symbols import PASSABLE
+
+
+# Flow field entry for cells with nowhere to go: the targets themselves and anything that cannot reach them
+NONE = 255
+
+
+'''
+Distance queries over a dungeon grid
+
+Fields are breadth-first searches out from a set of target cells, over flat indices into the grid
+	a distance field holds the number of steps from every cell to its nearest target, or -1 if no target can be reached
+	a flow field holds the direction code of the first step from every cell towards its nearest target, or NONE
+
+Fields are cached per set of targets, least recently used first, so every monster chasing the player on a floor reads the same flow field
+Writes to the grid must be reported through invalidate(), which only drops the fields the change could affect
+	@_walk holds 1 for every passable cell
+	@_fields maps a sorted tuple of target indices to its (distance field, flow field), least recently used first
+'''
+class Pathfinder(object):
+	def __init__(self, grid, passable = PASSABLE, maxFields = 16):
+		self._grid = grid
+		self._xDim = grid.xDim
+		self._yDim = grid.yDim
+		self._maxFields = max(maxFields, 1)
+
+		self._table = table(passable)
+		self._walk = bytearray(grid.read().translate(self._table))
+
+		self._fields = OrderedDict()
+		self._hits, self._misses = 0, 0
+
+
+	'''
+	Fields
+	'''
+	def distances(self, targets):
+		"""
+		Distance field towards @targets, a coordinate or a list of coordinates
+		"""
+		return self._field(targets)[0]
+
+	def flow(self, targets):
+		"""
+		Flow field towards @targets, a coordinate or a list of coordinates
+		"""
+		return self._field(targets)[1]
+
+	def distance(self, coord, targets):
+		"""
+		Number of steps from @coord to the nearest of @targets, or None if there is no way there
+		"""
+		if not self._grid.inBounds(coord):
+			return None
+
+		d = self.distances(targets)[coord[1] * self._xDim + coord[0]]
+		return None if d < 0 else d
+
+	def step(self, coord, targets):
+		"""
+		The cell to move to from @coord to get closer to @targets, or None when already there or cut off
+		"""
+		if not self._grid.inBounds(coord):
+			return None
+
+		code = self.flow(targets)[coord[1] * self._xDim + coord[0]]
+		return None if code == NONE else Direction.step(coord, code)
+
+	def farthest(self, targets):
+		"""
+		The reachable cell farthest from @targets and its distance, or None if no target is passable
+		"""
+		field = self.distances(targets)
+		d = max(field) if len(field) > 0 else -1
+
+		if d < 0:
+			return None
+
+		i = field.index(d)
+		return ((i % self._xDim, i // self._xDim), d)
+
+
+	'''
+	Paths between two cells
+	'''
+	def path(self, start, goal):
+		"""
+		Shortest list of cells from @start to @goal, both included, or None if there is no way there
+
+		Follows the flow field if one towards @goal is already cached, otherwise runs an A* search
+		"""
+		if not (self._grid.inBounds(start) and self._grid.inBounds(goal)):
+			return None
+
+		key = (goal[1] * self._xDim + goal[0],)
+		if key in self._fields:
+			self._fields.move_to_end(key)
+			self._hits += 1
+
+			# A cell that cannot be walked has no way to anywhere, not even to itself, just as in _search
+			flow = self._fields[key][1]
+			if not self._walk[key[0]] or (start != tuple(goal) and flow[start[1] * self._xDim + start[0]] == NONE):
+				return None
+
+			out = [tuple(start)]
+			while out[-1] != tuple(goal):
+				out.append(Direction.step(out[-1], flow[out[-1][1] * self._xDim + out[-1][0]]))
+
+			return out
+
+		return self._search(start, goal)
+
+
+	'''
+	Changes to the grid
+	'''
+	def invalidate(self, coord = None):
+		"""
+		Re-read @coord from the grid, dropping every cached field it changes, or re-read the whole grid when no @coord is given
+		"""
+		if coord == None:
+			self._walk = bytearray(self._grid.read().translate(self._table))
+			self._fields.clear()
+			return
+
+		xDim = self._xDim
+		i = coord[1] * xDim + coord[0]
+		walk = self._table[self._grid.cells[i]]
+
+		if walk == self._walk[i]:
+			return
+
+		self._walk[i] = walk
+
+		# A cell closing only matters to fields that reached it, a cell opening only to fields that reached a neighbour or target it
+		neighbours = [j for j in (i - xDim if i >= xDim else -1, i + xDim if i + xDim < len(self._walk) else -1, i - 1 if coord[0] > 0 else -1, i + 1 if coord[0] < xDim - 1 else -1) if j > -1]
+
+		for key in list(self._fields):
+			field = self._fields[key][0]
+
+			if walk == 0 and field[i] > -1:
+				del self._fields[key]
+			elif walk == 1 and (i in key or any([field[j] > -1 for j in neighbours])):
+				del self._fields[key]
+
+	def stats(self):
+		return {
+			'hits': self._hits,
+			'misses': self._misses,
+			'fields': len(self._fields)
+		}
+
+
+	'''
+	Helpers
+	'''
+	def _field(self, targets):
+		# A single coordinate is a list of one target
+		if len(targets) == 2 and isinstance(targets[0], int):
+			targets = [targets]
+
+		key = tuple(sorted(set([y * self._xDim + x for x, y in targets if self._grid.inBounds((x, y))])))
+
+		if key in self._fields:
+			self._fields.move_to_end(key)
+			self._hits += 1
+		else:
+			self._misses += 1
+			self._fields[key] = self._flood(key)
+
+			while len(self._fields) > self._maxFields:
+				self._fields.popitem(last = False)
+
+		return self._fields[key]
+
+	def _flood(self, sources):
+		"""
+		Breadth-first search out of every passable cell in @sources at once, one frontier list per distance
+		"""
+		xDim, walk = self._xDim, self._walk
+		size = len(walk)
+		N, S, E, W = Direction.N, Direction.S, Direction.E, Direction.W
+
+		field = array('i', [-1]) * size
+		flow = bytearray([NONE]) * size
+
+		frontier = []
+		for i in sources:
+			if walk[i]:
+				field[i] = 0
+				frontier.append(i)
+
+		d = 0
+		while len(frontier) > 0:
+			d += 1
+			nextFrontier = []
+
+			# Each newly reached cell's first step points back at the cell it was reached from
+			for i in frontier:
+				x = i % xDim
+
+				j = i - xDim
+				if j > -1 and walk[j] and field[j] < 0:
+					field[j], flow[j] = d, S
+					nextFrontier.append(j)
+
+				j = i + xDim
+				if j < size and walk[j] and field[j] < 0:
+					field[j], flow[j] = d, N
+					nextFrontier.append(j)
+
+				j = i - 1
+				if x > 0 and walk[j] and field[j] < 0:
+					field[j], flow[j] = d, E
+					nextFrontier.append(j)
+
+				j = i + 1
+				if x < xDim - 1 and walk[j] and field[j] < 0:
+					field[j], flow[j] = d, W
+					nextFrontier.append(j)
+
+			frontier = nextFrontier
+
+		return (field, flow)
+
+	def _search(self, start, goal):
+		"""
+		A* search with the Manhattan distance, over a heap of plain integers packing (f, index) so that no tuples are built
+		"""
+		xDim, walk = self._xDim, self._walk
+		size = len(walk)
+		begin, end = start[1] * xDim + start[0], goal[1] * xDim + goal[0]
+
+		if not (walk[begin] and walk[end]):
+			return None
+
+		gx, gy = goal
+		shift = size.bit_length()
+		mask = (1 << shift) - 1
+
+		cost = array('i', [-1]) * size
+		cameFrom = array('i', [-1]) * size
+		cost[begin] = 0
+
+		heap = [((abs(start[0] - gx) + abs(start[1] - gy)) << shift) | begin]
+		while len(heap) > 0:
+			item = heapq.heappop(heap)
+			i = item & mask
+
+			if i == end:
+				break
+
+			# Skip entries left behind by a cheaper route found later
+			g = cost[i]
+			x, y = i % xDim, i // xDim
+			if (item >> shift) != g + abs(x - gx) + abs(y - gy):
+				continue
+
+			for j, nx, ny in ((i - xDim, x, y - 1), (i + xDim, x, y + 1), (i - 1, x - 1, y), (i + 1, x + 1, y)):
+				if nx < 0 or nx >= xDim or ny < 0 or ny >= self._yDim or not walk[j]:
+					continue
+
+				if cost[j] < 0 or g + 1 < cost[j]:
+					cost[j] = g + 1
+					cameFrom[j] = i
+					heapq.heappush(heap, ((g + 1 + abs(nx - gx) + abs(ny - gy)) << shift) | j)
+		else:
+			return None
+
+		out = []
+		i = end
+		while i != -1:
+			out.append((i % xDim, i // xDim))
+			i = cameFrom[i]
+
+		out.reverse()
+		return out
\ No newline at end of file
@@ -0,0 +1,100 @@
+import re
+from array import array
+
+from Dungeon.Components.Bitsets import digits, setBits
+from Dungeon.Components.Symbols import PASSABLE
+from Dungeon.Components.UnionFind import UnionFind
+
+
+# Translation table from codes to ASCII binary digits, '1' for passable cells
+_PASSABLE = digits(PASSABLE)
+
+
+'''
+Connected regions of passable cells on a dungeon grid
+
+Regions are labelled in one pass over the rows: every run of passable cells in a row is joined with the runs it touches in the row above through a union-find
+	@labels holds the region of every cell, 1 to @count, or 0 for cells that are not passable
+'''
+class Regions(object):
+	def __init__(self, grid):
+		self.xDim = grid.xDim
+		self.yDim = grid.yDim
+		self.labels = array('I', [0]) * (grid.xDim * grid.yDim)
+
+		# Passable cells of every row as a bitset, bit x for column x
+		self.rows = []
+
+		# Label 0 stands for cells that are not passable
+		sets = UnionFind(1)
+
+		runs, above = [], []
+		for y in range(0, grid.yDim):
+			row = grid.read(y * grid.xDim, (y + 1) * grid.xDim).translate(_PASSABLE)
+			self.rows.append(int(row[::-1], 2) if grid.xDim > 0 else 0)
+
+			current = []
+			for run in re.finditer(b'1+', row):
+				current.append((run.start(), run.end(), sets.add()))
+
+			# Join with the overlapping runs above, walking both sorted lists together
+			i, j = 0, 0
+			while i < len(current) and j < len(above):
+				a, b = current[i], above[j]
+				if a[0] < b[1] and b[0] < a[1]:
+					sets.union(a[2], b[2])
+
+				if a[1] < b[1]:
+					i += 1
+				else:
+					j += 1
+
+			runs.append(current)
+			above = current
+
+		# Number the regions 1 to count and write every run out as one slice
+		region = {}
+		for y in range(0, grid.yDim):
+			for start, end, label in runs[y]:
+				root = sets.find(label)
+				if not root in region:
+					region[root] = len(region) + 1
+
+				self.labels[y * grid.xDim + start:y * grid.xDim + end] = array('I', [region[root]]) * (end - start)
+
+		self.count = len(region)
+
+	def label(self, coord):
+		return self.labels[coord[1] * self.xDim + coord[0]]
+
+	def connectors(self, grid, symbols):
+		"""
+		Find every cell holding one of @symbols that lies between two different regions, either left and right or above and below
+
+		Returns (flat index, region, region) triples, found a row at a time with bitset operations so that only real candidates are visited
+		"""
+		table = digits(symbols)
+		xDim, rows, labels = self.xDim, self.rows, self.labels
+
+		found = []
+		for y in range(0, self.yDim):
+			row = grid.read(y * xDim, (y + 1) * xDim).translate(table)
+			closed = int(row[::-1], 2) if xDim > 0 else 0
+
+			# Bit x is set when x - 1 and x + 1 are passable, or y - 1 and y + 1 are
+			between = closed & (rows[y] << 1) & (rows[y] >> 1)
+			if y > 0 and y < self.yDim - 1:
+				between |= closed & rows[y - 1] & rows[y + 1]
+
+			if between == 0:
+				continue
+
+			for x in setBits(between):
+				i = y * xDim + x
+
+				if x > 0 and x < xDim - 1 and labels[i - 1] and labels[i + 1] and labels[i - 1] != labels[i + 1]:
+					found.append((i, labels[i - 1], labels[i + 1]))
+				elif y > 0 and y < self.yDim - 1 and labels[i - xDim] and labels[i + xDim] and labels[i - xDim] != labels[i + xDim]:
+					found.append((i, labels[i - xDim], labels[i + xDim]))
+
+		return found
\ No newline at end of file
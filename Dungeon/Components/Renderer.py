@@ -0,0 +1,103 @@
+'''
+Incremental terminal output of a dungeon grid
+
+Each frame is a string of ANSI cursor moves followed by the symbols that changed since the last frame, so a redraw costs as much as what changed rather than the whole floor
+Only a viewport of the grid is drawn, positioned by a camera, so large floors can be played through a terminal-sized window
+	@_camera is the grid coordinate drawn at the upper left of the viewport
+	@_shown holds the codes of every viewport row as last drawn, or None when the next frame has to redraw everything
+'''
+class Renderer(object):
+	def __init__(self, grid, viewport = None, origin = (1, 1)):
+		"""
+		@viewport is the (width, height) of the window onto the grid, the whole grid by default
+		@origin is the terminal (column, row) the window is drawn at, counting from 1 as ANSI does
+		"""
+		self._grid = grid
+		self._width = grid.xDim if viewport == None else min(viewport[0], grid.xDim)
+		self._height = grid.yDim if viewport == None else min(viewport[1], grid.yDim)
+		self._origin = tuple(origin)
+
+		self._camera = (0, 0)
+		self._shown = None
+
+
+	'''
+	Camera
+	'''
+	@property
+	def camera(self):
+		return self._camera
+
+	def move(self, x, y):
+		"""
+		Put the upper left of the viewport at (x, y), kept inside the grid
+		"""
+		camera = (max(0, min(x, self._grid.xDim - self._width)), max(0, min(y, self._grid.yDim - self._height)))
+
+		if camera != self._camera:
+			self._camera = camera
+			self._shown = None
+
+	def center(self, coord):
+		"""
+		Move the camera so that @coord is as close to the middle of the viewport as the grid allows
+		"""
+		self.move(coord[0] - self._width // 2, coord[1] - self._height // 2)
+
+
+	'''
+	Frames
+	'''
+	def frame(self):
+		"""
+		ANSI output bringing the terminal up to date with the grid, the whole viewport the first time and after the camera moves
+		"""
+		grid = self._grid
+		x0, y0 = self._camera
+		column, row = self._origin
+
+		if self._shown == None:
+			self._shown = [None] * self._height
+
+		out = []
+		for y in range(0, self._height):
+			start = (y0 + y) * grid.xDim + x0
+			codes = grid.read(start, start + self._width)
+			shown = self._shown[y]
+
+			if codes == shown:
+				continue
+
+			# Redraw only the span between the first and last changed cell, found by XOR-ing the rows as integers
+			first, last = 0, self._width
+			if not shown == None:
+				diff = int.from_bytes(codes, 'big') ^ int.from_bytes(shown, 'big')
+				first = self._width - (diff.bit_length() + 7) // 8
+				last = self._width - ((diff & -diff).bit_length() - 1) // 8
+
+			out.append('\x1b[{};{}H'.format(row + y, column + first))
+			out.append(grid.row(y0 + y, x0 + first, x0 + last))
+
+			self._shown[y] = codes
+
+		return ''.join(out)
+
+	def full(self):
+		"""
+		ANSI output drawing the whole viewport, whatever was drawn before
+		"""
+		self._shown = None
+		return self.frame()
+
+	def invalidate(self):
+		"""
+		Make the next frame redraw everything, for when the terminal was cleared or drawn over
+		"""
+		self._shown = None
+
+	def __str__(self):
+		"""
+		The viewport as plain text, one line per row
+		"""
+		x0, y0 = self._camera
+		return ''.join([self._grid.row(y0 + y, x0, x0 + self._width) + '\n' for y in range(0, self._height)])
\ No newline at end of file
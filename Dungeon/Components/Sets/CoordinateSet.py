@@ -0,0 +1,145 @@
+import re
+from array import array
+
+
+# Position of a coordinate that is not in the set
+_ABSENT = 0xFFFFFFFF
+
+
+'''
+A set of x, y coordinates over a fixed x_dim by y_dim domain
+
+Members are kept as flat indices (y * x_dim + x) in a dense array, with a position map from every index in the domain to its slot in the dense array
+	@_dense holds the members in no particular order, so a uniform random member is one random slot
+	@_pos maps a flat index to its slot in @_dense, or _ABSENT
+'''
+class CoordinateSet(object):
+	def __init__(self, x_dim, y_dim, full = False):
+		self._xDim = x_dim
+		self._yDim = y_dim
+
+		if full:
+			self._dense = array('I', range(0, x_dim * y_dim))
+			self._pos = array('I', self._dense)
+		else:
+			self._dense = array('I')
+			self._pos = array('I', [_ABSENT]) * (x_dim * y_dim)
+
+	@classmethod
+	def fromGrid(cls, grid):
+		"""
+		Create the set of every DEFAULT (code 0) cell of @grid, one run of free cells at a time
+		"""
+		coords = cls(grid.xDim, grid.yDim)
+
+		for run in re.finditer(b'\x00+', grid.read()):
+			start, end = run.span()
+			coords._pos[start:end] = array('I', range(len(coords._dense), len(coords._dense) + end - start))
+			coords._dense.extend(range(start, end))
+
+		return coords
+
+
+	'''
+	Single coordinates
+	'''
+	def __len__(self):
+		return len(self._dense)
+
+	def __contains__(self, coord):
+		return self._inBounds(coord) and self._pos[coord[1] * self._xDim + coord[0]] != _ABSENT
+
+	def __iter__(self):
+		for i in self._dense:
+			yield divmod(i, self._xDim)[::-1]
+
+	def add(self, coord):
+		i = coord[1] * self._xDim + coord[0]
+
+		if self._pos[i] == _ABSENT:
+			self._pos[i] = len(self._dense)
+			self._dense.append(i)
+
+	def discard(self, coord):
+		"""
+		Remove @coord if it is in the set by moving the last member into its slot
+		"""
+		i = coord[1] * self._xDim + coord[0]
+		slot = self._pos[i]
+
+		if slot != _ABSENT:
+			last = self._dense.pop()
+			if last != i:
+				self._dense[slot] = last
+				self._pos[last] = slot
+
+			self._pos[i] = _ABSENT
+
+	def remove(self, coord):
+		if not coord in self:
+			raise KeyError(tuple(coord))
+
+		self.discard(coord)
+
+	def sample(self, rng):
+		"""
+		Uniformly pick a member using @rng (anything with randrange), or None if the set is empty
+		"""
+		if len(self._dense) == 0:
+			return None
+
+		y, x = divmod(self._dense[rng.randrange(0, len(self._dense))], self._xDim)
+		return (x, y)
+
+
+	'''
+	Inclusive rectangles
+	'''
+	def addRect(self, upperLeft, lowerRight):
+		for y in range(upperLeft[1], lowerRight[1] + 1):
+			self._addSpan(y * self._xDim + upperLeft[0], y * self._xDim + lowerRight[0] + 1)
+
+	def discardRect(self, upperLeft, lowerRight):
+		for y in range(upperLeft[1], lowerRight[1] + 1):
+			self._discardSpan(y * self._xDim + upperLeft[0], y * self._xDim + lowerRight[0] + 1)
+
+
+	'''
+	Helpers
+	'''
+	def _addSpan(self, start, end):
+		"""
+		Add the flat indices start to end - 1, all appended at the end of @_dense in order
+		"""
+		if self._pos[start:end].count(_ABSENT) == end - start:
+			self._pos[start:end] = array('I', range(len(self._dense), len(self._dense) + end - start))
+			self._dense.extend(range(start, end))
+			return
+
+		new = [start + k for k, slot in enumerate(self._pos[start:end]) if slot == _ABSENT]
+		for k, i in enumerate(new):
+			self._pos[i] = len(self._dense) + k
+
+		self._dense.extend(new)
+
+	def _discardSpan(self, start, end):
+		"""
+		Remove the flat indices start to end - 1: the members left in the tail of @_dense fill the freed slots in front of it, then the tail is cut off
+		"""
+		slots = [slot for slot in self._pos[start:end] if slot != _ABSENT]
+		if len(slots) == 0:
+			return
+
+		keep = len(self._dense) - len(slots)
+		holes = sorted([slot for slot in slots if slot < keep])
+		fillers = [i for i in self._dense[keep:] if i < start or i >= end]
+
+		for slot, i in zip(holes, fillers):
+			self._dense[slot] = i
+			self._pos[i] = slot
+
+		del self._dense[keep:]
+		self._pos[start:end] = array('I', [_ABSENT]) * (end - start)
+
+	def _inBounds(self, coord):
+		return coord[0] > -1 and coord[0] < self._xDim and coord[1] > -1 and coord[1] < self._yDim
\ No newline at end of file
@@ -0,0 +1,75 @@
+'''
+A sparse set of x, y coordinates
+
+Same interface as CoordinateSet, but without a fixed domain, for sets that stay much smaller than the dungeon (a frontier, a room's doors)
+	@_dense holds the members as tuples in no particular order
+	@_pos maps a member to its slot in @_dense
+'''
+class CoordinateSubset(object):
+	def __init__(self, coords = ()):
+		self._dense = []
+		self._pos = {}
+
+		for coord in coords:
+			self.add(coord)
+
+
+	'''
+	Single coordinates
+	'''
+	def __len__(self):
+		return len(self._dense)
+
+	def __contains__(self, coord):
+		return tuple(coord) in self._pos
+
+	def __iter__(self):
+		return iter(list(self._dense))
+
+	def add(self, coord):
+		coord = tuple(coord)
+
+		if not coord in self._pos:
+			self._pos[coord] = len(self._dense)
+			self._dense.append(coord)
+
+	def discard(self, coord):
+		"""
+		Remove @coord if it is in the set by moving the last member into its slot
+		"""
+		slot = self._pos.pop(tuple(coord), None)
+
+		if not slot == None:
+			last = self._dense.pop()
+			if slot < len(self._dense):
+				self._dense[slot] = last
+				self._pos[last] = slot
+
+	def remove(self, coord):
+		if not coord in self:
+			raise KeyError(tuple(coord))
+
+		self.discard(coord)
+
+	def sample(self, rng):
+		"""
+		Uniformly pick a member using @rng (anything with randrange), or None if the set is empty
+		"""
+		if len(self._dense) == 0:
+			return None
+
+		return self._dense[rng.randrange(0, len(self._dense))]
+
+
+	'''
+	Inclusive rectangles
+	'''
+	def addRect(self, upperLeft, lowerRight):
+		for y in range(upperLeft[1], lowerRight[1] + 1):
+			for x in range(upperLeft[0], lowerRight[0] + 1):
+				self.add((x, y))
+
+	def discardRect(self, upperLeft, lowerRight):
+		for y in range(upperLeft[1], lowerRight[1] + 1):
+			for x in range(upperLeft[0], lowerRight[0] + 1):
+				self.discard((x, y))
\ No newline at end of file
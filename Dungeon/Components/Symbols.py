@@ -0,0 +1,22 @@
+'''
+Maze property constants
+
+Grids store the code of a symbol (its index in SYMBOLS) rather than the symbol itself, so every cell fits in one byte
+'''
+DEFAULT = ' '
+WALL = 'W'
+ROOM = 'R'
+DOOR = 'D'
+LOCKED = 'L'
+ITEM = '?'
+DEAD_ZONE = 'X'
+DOWN_STAIRS = 'v'
+UP_STAIRS = '^'
+PATH = '█'
+
+# Code table, DEFAULT must stay at code 0 so that a zeroed grid is an empty dungeon
+SYMBOLS = (DEFAULT, WALL, ROOM, DOOR, LOCKED, ITEM, DEAD_ZONE, DOWN_STAIRS, UP_STAIRS, PATH)
+CODES = {symbol: code for code, symbol in enumerate(SYMBOLS)}
+
+# Symbols that can be walked on, everything else blocks movement and splits the floor into regions
+PASSABLE = (ROOM, DOOR, ITEM, DOWN_STAIRS, UP_STAIRS, PATH)
\ No newline at end of file
@@ -0,0 +1,38 @@
+'''
+A union-find forest over the labels 0 to n - 1
+
+Finding a root halves the path to it; a union keeps the smaller root, so every set is named by its smallest label
+'''
+class UnionFind(object):
+	def __init__(self, size = 0):
+		self._parent = list(range(0, size))
+
+	def __len__(self):
+		return len(self._parent)
+
+	def add(self):
+		"""
+		Add a label in a set of its own, returning it
+		"""
+		label = len(self._parent)
+		self._parent.append(label)
+		return label
+
+	def find(self, label):
+		parent = self._parent
+		while parent[label] != label:
+			parent[label] = parent[parent[label]]
+			label = parent[label]
+
+		return label
+
+	def union(self, a, b):
+		"""
+		Join the sets holding @a and @b, returning False if they were already the same set
+		"""
+		a, b = self.find(a), self.find(b)
+		if a == b:
+			return False
+
+		self._parent[max(a, b)] = min(a, b)
+		return True
\ No newline at end of file
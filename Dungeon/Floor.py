@@ -0,0 +1,194 @@
+import base64, json, mmap, re, struct
+
+from Dungeon import Dungeon
+from Dungeon.Components.Grid import Grid
+
+
+'''
+Binary floor format
+
+A floor file is a fixed header, a JSON block, then the cell codes
+	magic 'MTFL', format version, cell encoding, x_dim, y_dim, seed, length of the JSON block
+	the JSON block holds the generator parameters under 'params', and under 'state' the room registry and the RNG state when packed with @state (version 1 files hold only the parameters)
+
+Cell encodings
+	RAW: one byte per cell, the same layout as Grid.cells, so a loaded floor can be memory-mapped
+	NIBBLE: two cells per byte, the first cell in the high nibble
+	RLE: one byte per run of up to 16 equal cells, (run length - 1) in the high nibble and the code in the low nibble
+'''
+MAGIC = b'MTFL'
+VERSION = 2
+
+RAW, NIBBLE, RLE = 0, 1, 2
+
+_HEADER = struct.Struct('<4sHBxIIQI')
+
+# Nibble translation tables
+_TO_HIGH = bytes([(b << 4) & 0xFF for b in range(256)])
+_FROM_HIGH = bytes([b >> 4 for b in range(256)])
+_FROM_LOW = bytes([b & 0x0F for b in range(256)])
+
+
+'''
+Packing
+'''
+def pack(dungeon, encoding = NIBBLE, state = False):
+	"""
+	Serialize a dungeon to bytes
+
+	With @state, the room registry and the RNG state go along too, so the loaded floor carries on generating exactly like @dungeon would
+	"""
+	grid = dungeon.grid
+	cells = grid.read()
+
+	if encoding == RAW:
+		payload = bytes(cells)
+	elif encoding == NIBBLE:
+		payload = _packNibbles(cells)
+	elif encoding == RLE:
+		payload = _packRuns(cells)
+	else:
+		raise ValueError('Unknown cell encoding {}'.format(encoding))
+
+	block = {'params': dungeon.params}
+	if state:
+		version, internal, gauss = dungeon._random.getstate()
+		block['state'] = {
+			'rooms': [list(room.segments()) for room in dungeon.rooms],
+			'random': [version, base64.b64encode(struct.pack('<{}I'.format(len(internal)), *internal)).decode('ascii'), gauss]
+		}
+
+	blob = json.dumps(block, sort_keys = True, separators = (',', ':')).encode('utf-8')
+	header = _HEADER.pack(MAGIC, VERSION, encoding, grid.xDim, grid.yDim, dungeon.seed, len(blob))
+
+	return header + blob + payload
+
+def unpack(data):
+	"""
+	Deserialize a dungeon from bytes
+	"""
+	header, offset = _readHeader(data)
+	count = header['x_dim'] * header['y_dim']
+	payload = bytes(data[offset:])
+
+	if header['encoding'] == RAW:
+		cells = bytearray(payload[:count])
+	elif header['encoding'] == NIBBLE:
+		cells = _unpackNibbles(payload, count)
+	else:
+		cells = _unpackRuns(payload)
+
+	if len(cells) != count:
+		raise ValueError('Floor data is truncated')
+
+	return _toDungeon(header, Grid.fromBuffer(header['x_dim'], header['y_dim'], cells))
+
+
+'''
+Files
+'''
+def save(dungeon, path, encoding = NIBBLE):
+	with open(path, 'wb') as f:
+		f.write(pack(dungeon, encoding))
+
+def load(path, mapped = True, writable = False):
+	"""
+	Load a floor file
+
+	RAW floors are memory-mapped when @mapped is set, so the grid is the file's pages and nothing is copied
+	Edits to a mapped grid are private to the process unless @writable is set, in which case they are written back to the file
+	"""
+	with open(path, 'r+b' if writable else 'rb') as f:
+		if not mapped:
+			return unpack(f.read())
+
+		data = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_COPY)
+
+	header, offset = _readHeader(data)
+	if header['encoding'] != RAW:
+		return unpack(data)
+
+	count = header['x_dim'] * header['y_dim']
+	if len(data) - offset < count:
+		raise ValueError('Floor data is truncated')
+
+	return _toDungeon(header, Grid.fromBuffer(header['x_dim'], header['y_dim'], memoryview(data)[offset:offset + count]))
+
+def readHeader(path):
+	"""
+	Read only the header of a floor file: dimensions, seed, cell encoding, generator parameters and saved state (None if there is none)
+	"""
+	with open(path, 'rb') as f:
+		data = f.read(_HEADER.size)
+		params = f.read(_HEADER.unpack(data)[-1]) if len(data) == _HEADER.size else b''
+
+	return _readHeader(data + params)[0]
+
+
+'''
+Helpers
+'''
+def _readHeader(data):
+	if len(data) < _HEADER.size:
+		raise ValueError('Not a floor file')
+
+	magic, version, encoding, x_dim, y_dim, seed, length = _HEADER.unpack(bytes(data[:_HEADER.size]))
+	if magic != MAGIC:
+		raise ValueError('Not a floor file')
+	if version > VERSION:
+		raise ValueError('Floor format version {} is newer than {}'.format(version, VERSION))
+	if encoding not in (RAW, NIBBLE, RLE):
+		raise ValueError('Unknown cell encoding {}'.format(encoding))
+
+	offset = _HEADER.size + length
+	block = json.loads(bytes(data[_HEADER.size:offset]).decode('utf-8'))
+	if version < 2:
+		block = {'params': block}
+
+	return {'version': version, 'encoding': encoding, 'x_dim': x_dim, 'y_dim': y_dim, 'seed': seed, 'params': block['params'], 'state': block.get('state')}, offset
+
+def _toDungeon(header, grid):
+	dungeon = Dungeon(header['x_dim'], header['y_dim'], header['seed'], grid = grid)
+	dungeon._params = header['params']
+
+	state = header['state']
+	if not state == None:
+		# The rooms are already drawn in the cells, which may have changed since, so they are only registered, and only once they are needed
+		dungeon._savedRooms = state['rooms']
+
+		version, internal, gauss = state['random']
+		internal = base64.b64decode(internal)
+		dungeon._random.setstate((version, struct.unpack('<{}I'.format(len(internal) // 4), internal), gauss))
+
+	return dungeon
+
+def _packNibbles(cells):
+	# Pad to an even number of cells, then OR the shifted even cells into the odd ones as two big integers
+	cells = bytes(cells) + b'\x00' * (len(cells) % 2)
+	high, low = cells[0::2].translate(_TO_HIGH), cells[1::2]
+
+	return (int.from_bytes(high, 'big') | int.from_bytes(low, 'big')).to_bytes(len(high), 'big')
+
+def _unpackNibbles(data, count):
+	cells = bytearray(len(data) * 2)
+	cells[0::2] = data.translate(_FROM_HIGH)
+	cells[1::2] = data.translate(_FROM_LOW)
+
+	del cells[count:]
+	return cells
+
+def _packRuns(cells):
+	out = bytearray()
+
+	for run in re.finditer(b'(.)\\1*', cells, re.S):
+		code, length = run.group(1)[0], run.end() - run.start()
+		full, rest = divmod(length, 16)
+
+		out += bytes([0xF0 | code]) * full
+		if rest > 0:
+			out.append((rest - 1) << 4 | code)
+
+	return bytes(out)
+
+def _unpackRuns(data):
+	return bytearray(b''.join([bytes([b & 0x0F]) * ((b >> 4) + 1) for b in data]))
\ No newline at end of file
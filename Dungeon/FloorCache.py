@@ -0,0 +1,136 @@
+import hashlib, json, os, tempfile
+from collections import OrderedDict
+
+from Dungeon import PARAMS, GENERATOR_VERSION
+from Dungeon import Floor
+
+
+'''
+A content-addressed on-disk cache of generated floors
+
+Floors are stored as RAW floor files named by a hash of everything that determines them, so a hit is one memory-mapped load
+Each file also holds the floor's rooms and RNG state, so a loaded floor can be connected, pruned or stocked exactly like a freshly generated one
+Entries are evicted least recently used first once the cache grows past @maxBytes
+	@_entries maps each key to its file size, least recently used first
+'''
+class FloorCache(object):
+	SUFFIX = '.floor'
+
+	def __init__(self, directory, maxBytes = 256 * 1024 * 1024):
+		self._directory = directory
+		self._maxBytes = maxBytes
+
+		self._entries = OrderedDict()
+		self._bytes = 0
+		self._hits, self._misses, self._evictions = 0, 0, 0
+
+		os.makedirs(directory, exist_ok = True)
+
+		# Pick up floors from earlier runs, oldest access first
+		files = []
+		for name in os.listdir(directory):
+			if name.endswith(FloorCache.SUFFIX):
+				stat = os.stat(os.path.join(directory, name))
+				files.append((stat.st_mtime, name[:-len(FloorCache.SUFFIX)], stat.st_size))
+
+		for mtime, key, size in sorted(files):
+			self._entries[key] = size
+			self._bytes += size
+
+		self._evict()
+
+	@staticmethod
+	def key(params, seed):
+		"""
+		Hash of the full generator parameters, the seed and the generator version
+		"""
+		blob = json.dumps([dict(PARAMS, **params), seed, GENERATOR_VERSION], sort_keys = True, separators = (',', ':'))
+		return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+	'''
+	Lookups
+	'''
+	def get(self, params, seed):
+		"""
+		Load the cached floor for @params and @seed, or None on a miss
+		"""
+		key = FloorCache.key(params, seed)
+
+		if key in self._entries:
+			try:
+				dungeon = Floor.load(self._path(key))
+			except (OSError, ValueError):
+				# Deleted or damaged behind our back
+				self._forget(key)
+			else:
+				self._entries.move_to_end(key)
+				os.utime(self._path(key))
+
+				self._hits += 1
+				return dungeon
+
+		self._misses += 1
+		return None
+
+	def put(self, dungeon, params, seed):
+		"""
+		Store a generated floor, evicting old floors if the cache is over size
+		"""
+		key = FloorCache.key(params, seed)
+		data = Floor.pack(dungeon, Floor.RAW, state = True)
+
+		# Write to a temporary file first so that readers never see a partial floor
+		fd, temp = tempfile.mkstemp(dir = self._directory)
+		with os.fdopen(fd, 'wb') as f:
+			f.write(data)
+		os.replace(temp, self._path(key))
+
+		if key in self._entries:
+			self._bytes -= self._entries[key]
+
+		self._entries[key] = len(data)
+		self._entries.move_to_end(key)
+		self._bytes += len(data)
+
+		self._evict()
+
+	def __contains__(self, key):
+		return key in self._entries
+
+	def __len__(self):
+		return len(self._entries)
+
+	def stats(self):
+		return {
+			'hits': self._hits,
+			'misses': self._misses,
+			'evictions': self._evictions,
+			'entries': len(self._entries),
+			'bytes': self._bytes,
+			'maxBytes': self._maxBytes
+		}
+
+	def clear(self):
+		for key in list(self._entries):
+			self._forget(key)
+
+
+	'''
+	Helpers
+	'''
+	def _path(self, key):
+		return os.path.join(self._directory, key + FloorCache.SUFFIX)
+
+	def _evict(self):
+		while self._bytes > self._maxBytes and len(self._entries) > 0:
+			self._forget(next(iter(self._entries)))
+			self._evictions += 1
+
+	def _forget(self, key):
+		self._bytes -= self._entries.pop(key)
+
+		try:
+			os.remove(self._path(key))
+		except OSError:
+			pass
\ No newline at end of file
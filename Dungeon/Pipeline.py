@@ -0,0 +1,147 @@
+from collections import OrderedDict
+
+from Dungeon import Dungeon
+
+
+'''
+Generation stages
+
+A stage is a name, a function run on the dungeon with the stage's parameters as keyword arguments, and the defaults of those parameters
+'''
+class Stage(object):
+	def __init__(self, name, run, **params):
+		self.name = name
+		self.run = run
+		self.params = params
+
+
+def _rooms(dungeon, minX, maxX, minY, maxY, numTries, roomAmount, bias, guarantee):
+	dungeon.setRoomSize(minX = minX, maxX = maxX, minY = minY, maxY = maxY)
+	dungeon.setNumTries(numTries)
+	dungeon.setRoomAmount(roomAmount)
+	dungeon.createRooms(bias, guarantee)
+
+# The standard floor, every stage in the order it has to run
+STAGES = (
+	Stage('rooms', _rooms, minX = 2, maxX = 8, minY = 2, maxY = 8, numTries = 50, roomAmount = 20, bias = 0.5, guarantee = False),
+	Stage('maze', lambda dungeon, bias: dungeon.createMaze(bias), bias = 1.0),
+	Stage('connectors', lambda dungeon, extra: dungeon.connectRegions(extra), extra = 0.0),
+	Stage('pruning', lambda dungeon, sparseness: dungeon.removeDeadEnds(sparseness), sparseness = 1.0),
+	Stage('stairs', lambda dungeon: dungeon.placeStairs()),
+	Stage('items', lambda dungeon, amount: dungeon.placeItems(amount), amount = 10)
+)
+
+
+'''
+A generation pipeline with a snapshot of the floor after every stage
+
+Snapshots are keyed by the floor size, the seed and the parameters of the stage and every stage before it, so changing a stage's parameters only re-runs that stage and the ones after it
+Going back to parameters tried earlier is free while their snapshots are still held
+	@_params maps every stage name to its current parameters
+	@_snapshots maps a key to the dungeon as it was after that stage, least recently used first
+'''
+class Pipeline(object):
+	def __init__(self, x_dim, y_dim, seed, stages = STAGES, maxSnapshots = 64):
+		self._xDim = x_dim
+		self._yDim = y_dim
+		self._seed = seed
+		self._stages = list(stages)
+		self._maxSnapshots = max(maxSnapshots, len(self._stages))
+
+		self._params = {stage.name: dict(stage.params) for stage in self._stages}
+		self._snapshots = OrderedDict()
+
+		# Statistics
+		self._runs, self._reused = 0, 0
+
+	@property
+	def seed(self):
+		return self._seed
+
+	@property
+	def params(self):
+		return {name: dict(params) for name, params in self._params.items()}
+
+
+	'''
+	Tuning
+	'''
+	def set(self, stage, **params):
+		"""
+		Change some of the parameters of @stage
+		"""
+		if not stage in self._params:
+			raise KeyError('No stage named {}'.format(stage))
+
+		for key in params:
+			if not key in self._params[stage]:
+				raise KeyError('Stage {} has no parameter {}'.format(stage, key))
+
+		self._params[stage].update(params)
+
+	def reseed(self, seed):
+		self._seed = seed
+
+
+	'''
+	Building
+	'''
+	def build(self, upTo = None):
+		"""
+		The dungeon after every stage, or after stage @upTo, re-running only the stages whose snapshots are missing
+
+		The dungeon returned is a copy, changing it leaves the snapshots alone
+		"""
+		keys = self._keys()
+		last = len(self._stages) - 1 if upTo == None else [stage.name for stage in self._stages].index(upTo)
+
+		# Start from the latest stage that is still cached
+		start, dungeon = 0, None
+		for k in range(last, -1, -1):
+			if keys[k] in self._snapshots:
+				self._snapshots.move_to_end(keys[k])
+				self._reused += 1
+				start, dungeon = k + 1, self._snapshots[keys[k]]
+				break
+
+		dungeon = Dungeon(self._xDim, self._yDim, self._seed) if dungeon == None else dungeon.copy()
+
+		for k in range(start, last + 1):
+			stage = self._stages[k]
+			stage.run(dungeon, **self._params[stage.name])
+			self._runs += 1
+
+			self._snapshots[keys[k]] = dungeon
+			dungeon = dungeon.copy()
+
+		while len(self._snapshots) > self._maxSnapshots:
+			self._snapshots.popitem(last = False)
+
+		dungeon._params = {'x_dim': self._xDim, 'y_dim': self._yDim, 'stages': self.params}
+		return dungeon
+
+	def stats(self):
+		"""
+		Stages run and snapshots reused over every build so far
+		"""
+		return {
+			'runs': self._runs,
+			'reused': self._reused,
+			'snapshots': len(self._snapshots)
+		}
+
+	def clear(self):
+		self._snapshots.clear()
+
+
+	'''
+	Helpers
+	'''
+	def _keys(self):
+		# Every key includes the one before it, so it covers everything upstream
+		keys, key = [], (self._xDim, self._yDim, self._seed)
+		for stage in self._stages:
+			key = (key, stage.name, tuple(sorted(self._params[stage.name].items())))
+			keys.append(key)
+
+		return keys
\ No newline at end of file
@@ -0,0 +1,157 @@
+import math, struct, zlib
+
+from Dungeon.Components.Symbols import SYMBOLS, DEFAULT, WALL, ROOM, DOOR, LOCKED, ITEM, DEAD_ZONE, DOWN_STAIRS, UP_STAIRS, PATH
+
+
+'''
+Image export of floors
+
+Images are built as indexed pixels, one byte per pixel holding a cell code, straight from the grid's buffer
+	scaling repeats pixels with strided slice assignments over the whole image, never a Python loop per cell
+	RGB output splits the indices into channels with one bytes.translate per channel through the palette
+	PNG output stores the indices as they are, with the palette in a PLTE chunk
+
+A palette maps every symbol to an (r, g, b) tuple, symbols missing from it are drawn in BACKGROUND
+'''
+PALETTE = {
+	DEFAULT: (0, 0, 0),
+	WALL: (90, 90, 100),
+	ROOM: (200, 180, 140),
+	DOOR: (160, 90, 40),
+	LOCKED: (200, 40, 40),
+	ITEM: (240, 210, 60),
+	DEAD_ZONE: (60, 0, 60),
+	DOWN_STAIRS: (60, 200, 220),
+	UP_STAIRS: (60, 220, 120),
+	PATH: (150, 140, 120)
+}
+
+# Colour of the gaps between tiles on a contact sheet
+BACKGROUND = (30, 30, 30)
+
+# Pixel index of BACKGROUND, right after the cell codes
+_GAP = len(SYMBOLS)
+
+
+'''
+Indexed images, as (width, height, one index per pixel)
+'''
+def indexed(dungeon, scale = 1):
+	"""
+	Pixels of a floor, @scale by @scale pixels per cell
+	"""
+	grid = dungeon.grid
+	pixels = grid.view()
+
+	if scale == 1:
+		return (grid.xDim, grid.yDim, pixels)
+
+	# Repeat every cell across, then every row down
+	width = grid.xDim * scale
+	wide = bytearray(width * grid.yDim)
+	for k in range(0, scale):
+		wide[k::scale] = pixels
+
+	out = bytearray(width * grid.yDim * scale)
+	for y in range(0, grid.yDim):
+		out[y * width * scale:(y + 1) * width * scale] = wide[y * width:(y + 1) * width] * scale
+
+	return (width, grid.yDim * scale, out)
+
+def contactSheet(dungeons, columns = None, scale = 1, gap = 2):
+	"""
+	Thumbnails of every floor tiled left to right, top to bottom, @gap pixels apart
+
+	Tiles are as large as the largest floor, smaller floors sit at the upper left of their tile
+	"""
+	images = [indexed(dungeon, scale) for dungeon in dungeons]
+	if len(images) == 0:
+		return (0, 0, bytearray())
+
+	columns = columns if not columns == None else math.ceil(math.sqrt(len(images)))
+	rows = math.ceil(len(images) / columns)
+
+	tileX, tileY = max([image[0] for image in images]), max([image[1] for image in images])
+	width, height = columns * (tileX + gap) + gap, rows * (tileY + gap) + gap
+
+	out = bytearray([_GAP]) * (width * height)
+	for n, (w, h, pixels) in enumerate(images):
+		left = gap + (n % columns) * (tileX + gap)
+		top = gap + (n // columns) * (tileY + gap)
+
+		for y in range(0, h):
+			start = (top + y) * width + left
+			out[start:start + w] = pixels[y * w:(y + 1) * w]
+
+	return (width, height, out)
+
+
+'''
+Encoders, each taking an indexed image
+'''
+def rgb(image, palette = PALETTE):
+	"""
+	Raw RGB bytes, three per pixel
+	"""
+	width, height, pixels = image
+	colours = _colours(palette)
+
+	# translate() needs bytes, which costs one copy of the grid's view
+	pixels = pixels if isinstance(pixels, (bytes, bytearray)) else bytes(pixels)
+
+	out = bytearray(width * height * 3)
+	for channel in range(0, 3):
+		table = bytes([colours[i][channel] if i < len(colours) else 0 for i in range(256)])
+		out[channel::3] = pixels.translate(table)
+
+	return out
+
+def ppm(image, palette = PALETTE):
+	"""
+	Binary PPM (P6) file contents
+	"""
+	return 'P6\n{} {}\n255\n'.format(image[0], image[1]).encode('ascii') + rgb(image, palette)
+
+def png(image, palette = PALETTE, level = 6):
+	"""
+	Palette PNG file contents, compressed with zlib
+	"""
+	width, height, pixels = image
+	colours = _colours(palette)
+
+	# Every row starts with filter type 0, no filtering
+	raw = bytearray((width + 1) * height)
+	for y in range(0, height):
+		raw[y * (width + 1) + 1:(y + 1) * (width + 1)] = pixels[y * width:(y + 1) * width]
+
+	return b'\x89PNG\r\n\x1a\n' + b''.join([
+		_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 3, 0, 0, 0)),
+		_chunk(b'PLTE', b''.join([bytes(colour) for colour in colours])),
+		_chunk(b'IDAT', zlib.compress(raw, level)),
+		_chunk(b'IEND', b'')
+	])
+
+def save(image, path, palette = PALETTE):
+	"""
+	Write an indexed image to @path as a PNG, PPM or raw RGB file, chosen by the extension
+	"""
+	if path.lower().endswith('.png'):
+		data = png(image, palette)
+	elif path.lower().endswith('.ppm'):
+		data = ppm(image, palette)
+	else:
+		data = rgb(image, palette)
+
+	with open(path, 'wb') as f:
+		f.write(data)
+
+
+'''
+Helpers
+'''
+def _colours(palette):
+	# One colour per pixel index, the cell codes then the gap
+	return [tuple(palette.get(symbol, BACKGROUND)) for symbol in SYMBOLS] + [BACKGROUND]
+
+def _chunk(kind, data):
+	return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xFFFFFFFF)
\ No newline at end of file
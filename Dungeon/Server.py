@@ -0,0 +1,289 @@
+import asyncio, json, logging, os, random, time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit, parse_qsl
+
+from Dungeon import PARAMS
+from Dungeon import Floor
+from Dungeon.Batch import generatePacked
+from Dungeon.FloorCache import FloorCache
+
+
+_log = logging.getLogger(__name__)
+
+
+'''
+A local floor generation service
+
+Floors are generated on a process pool so that a burst of requests never stalls the caller's event loop
+	requests for a floor that is already being generated wait on the same job instead of starting another
+	for the parameter sets in @warm, a queue of floors with fresh seeds is kept ready, and requests without a seed are answered from it straight away
+	recently generated floors are kept in a small LRU, so a burst that arrives just after a floor is done is still answered from memory
+	a warm generation that fails is logged and retried, waiting twice as long after every failure in a row, up to RETRY_MAX seconds
+	@_inflight maps a FloorCache key to the future of the job generating it
+	@_warm maps a FloorCache key of a parameter set to (params, queue of (seed, floor bytes))
+'''
+class FloorServer(object):
+	# Seconds to wait before retrying a failed warm generation, doubling up to RETRY_MAX
+	RETRY = 0.5
+	RETRY_MAX = 60.0
+
+	def __init__(self, workers = None, warm = (), warmDepth = 4, encoding = Floor.NIBBLE, recent = 64, executor = None):
+		self._executor = executor if not executor == None else ProcessPoolExecutor(max_workers = workers or os.cpu_count() or 1)
+		self._ownsExecutor = executor == None
+		self._encoding = encoding
+		self._warmDepth = warmDepth
+
+		self._inflight = {}
+		self._recent = OrderedDict()
+		self._maxRecent = recent
+		self._warm = OrderedDict()
+		self._refills = {}
+
+		for params in warm:
+			params = dict(PARAMS, **params)
+			self._warm[FloorCache.key(params, None)] = (params, deque())
+
+		# Statistics
+		self._latency = deque(maxlen = 4096)
+		self._requests, self._coalesced, self._warmHits, self._recentHits = 0, 0, 0, 0
+
+	async def __aenter__(self):
+		self.start()
+		return self
+
+	async def __aexit__(self, *exc):
+		await self.close()
+
+	def start(self):
+		"""
+		Begin filling the warm queues, needs a running event loop
+		"""
+		for key in self._warm:
+			self._refill(key)
+
+	async def close(self):
+		for task in list(self._refills.values()):
+			task.cancel()
+
+		await asyncio.gather(*self._refills.values(), return_exceptions = True)
+
+		# Waiting for the workers blocks, so do it off the event loop
+		if self._ownsExecutor:
+			await asyncio.to_thread(self._executor.shutdown, wait = True, cancel_futures = True)
+
+
+	'''
+	Requests
+	'''
+	async def get(self, params, seed = None):
+		"""
+		Packed floor bytes for @params and @seed, and the seed used, which is a fresh one when @seed is None
+		"""
+		started = time.perf_counter()
+		self._requests += 1
+
+		unknown = [key for key in params if not key in PARAMS]
+		if len(unknown) > 0:
+			raise ValueError('Unknown generator parameters: {}'.format(', '.join(sorted(unknown))))
+
+		# Floor files hold the seed as an unsigned 64-bit integer
+		if not seed == None and (not isinstance(seed, int) or isinstance(seed, bool) or seed < 0 or seed >= 2 ** 64):
+			raise ValueError('A seed must be a whole number from 0 to 2 ** 64 - 1, not {!r}'.format(seed))
+
+		params = dict(PARAMS, **params)
+
+		try:
+			if seed == None:
+				warmKey = FloorCache.key(params, None)
+
+				if warmKey in self._warm and len(self._warm[warmKey][1]) > 0:
+					self._warmHits += 1
+					seed, data = self._warm[warmKey][1].popleft()
+					self._refill(warmKey)
+					return data, seed
+
+				seed = random.randrange(0, 2 ** 32)
+
+			return await self._generate(params, seed), seed
+		finally:
+			self._latency.append(time.perf_counter() - started)
+
+	def stats(self):
+		"""
+		Queue depth, warm queue sizes and request latency percentiles in seconds
+		"""
+		latency = sorted(self._latency)
+		def percentile(p):
+			return latency[min(len(latency) - 1, int(p * len(latency)))] if len(latency) > 0 else None
+
+		return {
+			'requests': self._requests,
+			'coalesced': self._coalesced,
+			'warmHits': self._warmHits,
+			'recentHits': self._recentHits,
+			'queueDepth': len(self._inflight),
+			'warm': [len(queue) for params, queue in self._warm.values()],
+			'p50': percentile(0.50),
+			'p99': percentile(0.99)
+		}
+
+
+	'''
+	Helpers
+	'''
+	async def _generate(self, params, seed):
+		key = FloorCache.key(params, seed)
+
+		if key in self._recent:
+			self._recent.move_to_end(key)
+			self._recentHits += 1
+			return self._recent[key]
+
+		if key in self._inflight:
+			self._coalesced += 1
+		else:
+			loop = asyncio.get_running_loop()
+			self._inflight[key] = loop.run_in_executor(self._executor, generatePacked, params, seed, self._encoding)
+			self._inflight[key].add_done_callback(lambda future: self._done(key, future))
+
+		# A caller giving up must not cancel the job for everyone else waiting on it
+		return await asyncio.shield(self._inflight[key])
+
+	def _done(self, key, future):
+		del self._inflight[key]
+
+		if not future.cancelled() and future.exception() == None:
+			self._recent[key] = future.result()
+			while len(self._recent) > self._maxRecent:
+				self._recent.popitem(last = False)
+
+	def _refill(self, warmKey):
+		# One refill per queue at a time, it keeps going until the queue is full
+		if not warmKey in self._refills:
+			self._refills[warmKey] = asyncio.get_running_loop().create_task(self._fill(warmKey))
+
+	async def _fill(self, warmKey):
+		params, queue = self._warm[warmKey]
+		delay = 0.0
+
+		try:
+			while len(queue) < self._warmDepth:
+				seed = random.randrange(0, 2 ** 32)
+
+				try:
+					data = await asyncio.get_running_loop().run_in_executor(self._executor, generatePacked, params, seed, self._encoding)
+				except Exception:
+					# Nothing else would ever refill an empty queue, so keep trying
+					delay = min(max(delay * 2, FloorServer.RETRY), FloorServer.RETRY_MAX)
+					_log.exception('Warm floor generation failed, retrying in %.1f s', delay)
+					await asyncio.sleep(delay)
+					continue
+
+				delay = 0.0
+				queue.append((seed, data))
+		finally:
+			del self._refills[warmKey]
+
+
+'''
+HTTP front end, served on localhost and/or a Unix socket
+
+	GET /floor?seed=1&x_dim=200	packed floor, the seed used is in the X-Seed header; parameter values are read as JSON where they parse
+	POST /floor	the same, with a JSON body {"params": {...}, "seed": 1}
+	GET /stats	FloorServer.stats() as JSON
+'''
+async def _handle(server, reader, writer):
+	try:
+		while True:
+			line = await reader.readline()
+			if len(line) == 0:
+				break
+
+			method, target, version = line.decode('latin-1').split(' ', 2)
+			headers = {}
+			while True:
+				line = (await reader.readline()).decode('latin-1').strip()
+				if line == '':
+					break
+				name, value = line.split(':', 1)
+				headers[name.strip().lower()] = value.strip()
+
+			body = await reader.readexactly(int(headers.get('content-length', 0)))
+			status, kind, payload, extra = await _respond(server, method, target, body)
+
+			keepAlive = version.strip() == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+			head = ['HTTP/1.1 {}'.format(status), 'Content-Type: {}'.format(kind), 'Content-Length: {}'.format(len(payload)), 'Connection: {}'.format('keep-alive' if keepAlive else 'close')]
+			head += ['{}: {}'.format(name, value) for name, value in extra.items()]
+
+			writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + payload)
+			await writer.drain()
+
+			if not keepAlive:
+				break
+	except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+		pass
+	finally:
+		writer.close()
+
+async def _respond(server, method, target, body):
+	url = urlsplit(target)
+
+	if url.path == '/stats' and method == 'GET':
+		return '200 OK', 'application/json', json.dumps(server.stats()).encode('utf-8'), {}
+
+	if url.path != '/floor' or not method in ('GET', 'POST'):
+		return '404 Not Found', 'text/plain', b'Not found', {}
+
+	try:
+		if method == 'POST':
+			request = json.loads(body.decode('utf-8'))
+			if not isinstance(request, dict):
+				raise ValueError('Request body must be a JSON object')
+
+			params, seed = request.get('params', {}), request.get('seed')
+			if not isinstance(params, dict):
+				raise ValueError('params must be a JSON object')
+		else:
+			params = dict([(name, _value(value)) for name, value in parse_qsl(url.query)])
+			seed = params.pop('seed', None)
+
+		data, seed = await server.get(params, seed)
+	except (ValueError, TypeError) as e:
+		return '400 Bad Request', 'text/plain', str(e).encode('utf-8'), {}
+	except Exception as e:
+		return '500 Internal Server Error', 'text/plain', str(e).encode('utf-8'), {}
+
+	return '200 OK', 'application/octet-stream', data, {'X-Seed': seed}
+
+def _value(text):
+	try:
+		return json.loads(text)
+	except ValueError:
+		return text
+
+async def serve(server, host = '127.0.0.1', port = 8765, path = None):
+	"""
+	Serve @server over HTTP on @host:@port, and on the Unix socket @path if given, until cancelled
+	"""
+	servers = []
+	handler = lambda reader, writer: _handle(server, reader, writer)
+
+	if not port == None:
+		servers.append(await asyncio.start_server(handler, host, port))
+	if not path == None:
+		servers.append(await asyncio.start_unix_server(handler, path))
+
+	try:
+		await asyncio.gather(*[s.serve_forever() for s in servers])
+	finally:
+		for s in servers:
+			s.close()
+
+
+if __name__ == '__main__':
+	async def main():
+		async with FloorServer(warm = [{}]) as server:
+			await serve(server)
+
+	asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,184 @@
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+from Dungeon import Dungeon
+from Dungeon.Components.Grid import Grid
+from Dungeon.Components.Symbols import CODES, UP_STAIRS, DOWN_STAIRS
+
+
+'''
+A tower of floors in shared memory
+
+One shared memory block holds a fixed header, then one fixed-size slot per floor: a floor header followed by room for @maxCells cell codes, laid out like Grid.cells
+	tower header: magic 'MTST', layout version, number of slots, cells per slot
+	floor header: x_dim, y_dim, seed, up stairs x and y, down stairs x and y (-1 when missing), sequence number
+
+Any process can attach by name and get Dungeons whose grids are the shared cells themselves, so nothing is pickled or copied
+Edits to a shared grid are seen by every process at once; the writer bumps the floor's sequence number with set() or touch(), so readers can tell when to redraw
+There is no locking: each floor is expected to have a single writer
+'''
+MAGIC = b'MTST'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sHxxII')
+_FLOOR = struct.Struct('<IIQiiiiQ')
+
+# Offset of the sequence number in a floor header
+_SEQUENCE = _FLOOR.size - 8
+
+
+class SharedTower(object):
+	def __init__(self, memory, owner):
+		self._memory = memory
+		self._owner = owner
+
+		magic, version, self._floors, self._maxCells = _HEADER.unpack_from(memory.buf, 0)
+		if magic != MAGIC or version != VERSION:
+			raise ValueError('Not a shared tower: {}'.format(memory.name))
+
+		self._slot = _FLOOR.size + self._maxCells
+
+	@classmethod
+	def create(cls, floors, maxCells, name = None):
+		"""
+		Allocate a new tower with @floors slots of up to @maxCells cells each; the creating process owns it and should unlink() it when done
+		"""
+		size = _HEADER.size + floors * (_FLOOR.size + maxCells)
+		memory = shared_memory.SharedMemory(name = name, create = True, size = size)
+
+		_HEADER.pack_into(memory.buf, 0, MAGIC, VERSION, floors, maxCells)
+		for n in range(0, floors):
+			_FLOOR.pack_into(memory.buf, _HEADER.size + n * (_FLOOR.size + maxCells), 0, 0, 0, -1, -1, -1, -1, 0)
+
+		return cls(memory, True)
+
+	@classmethod
+	def attach(cls, name):
+		"""
+		Attach to a tower created by another process
+		"""
+		# Only the owner may unlink the block, so keep the resource tracker from doing it when this process exits
+		try:
+			memory = shared_memory.SharedMemory(name = name, track = False)
+		except TypeError:
+			# Before Python 3.13 attaching always registers the block with the tracker
+			register = resource_tracker.register
+			resource_tracker.register = lambda name, rtype: None
+			try:
+				memory = shared_memory.SharedMemory(name = name)
+			finally:
+				resource_tracker.register = register
+
+		return cls(memory, False)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+		if self._owner:
+			self.unlink()
+
+	def close(self):
+		"""
+		Detach from the shared memory; every Dungeon handed out by this tower has to be dropped first
+		"""
+		self._memory.close()
+
+	def unlink(self):
+		self._memory.unlink()
+
+	@property
+	def name(self):
+		return self._memory.name
+
+	def __len__(self):
+		return self._floors
+
+
+	'''
+	Floors
+	'''
+	def store(self, number, dungeon):
+		"""
+		Copy a floor into slot @number, finding its stairs, and bump the slot's sequence number
+		"""
+		grid = dungeon.grid
+		count = grid.xDim * grid.yDim
+		if count > self._maxCells:
+			raise ValueError('A {} x {} floor does not fit in {} cells'.format(grid.xDim, grid.yDim, self._maxCells))
+
+		cells = grid.read()
+		stairs = []
+		for symbol in (UP_STAIRS, DOWN_STAIRS):
+			i = cells.find(bytes([CODES[symbol]]))
+			stairs += [-1, -1] if i < 0 else [i % grid.xDim, i // grid.xDim]
+
+		offset = self._offset(number)
+		self._memory.buf[offset + _FLOOR.size:offset + _FLOOR.size + count] = cells
+		_FLOOR.pack_into(self._memory.buf, offset, grid.xDim, grid.yDim, dungeon.seed, *stairs, self.sequence(number) + 1)
+
+	def dungeon(self, number):
+		"""
+		The floor in slot @number as a Dungeon over the shared cells, or None if nothing was stored there
+		"""
+		header = self.header(number)
+		if header['x_dim'] * header['y_dim'] == 0:
+			return None
+
+		start = self._offset(number) + _FLOOR.size
+		grid = Grid.fromBuffer(header['x_dim'], header['y_dim'], self._memory.buf[start:start + header['x_dim'] * header['y_dim']])
+
+		return Dungeon(header['x_dim'], header['y_dim'], header['seed'], grid = grid)
+
+	def header(self, number):
+		"""
+		Dimensions, seed, stairs (None when missing) and sequence number of slot @number
+		"""
+		x_dim, y_dim, seed, upX, upY, downX, downY, sequence = _FLOOR.unpack_from(self._memory.buf, self._offset(number))
+
+		return {
+			'x_dim': x_dim,
+			'y_dim': y_dim,
+			'seed': seed,
+			'up': None if upX < 0 else (upX, upY),
+			'down': None if downX < 0 else (downX, downY),
+			'sequence': sequence
+		}
+
+
+	'''
+	Edits and change detection
+	'''
+	def sequence(self, number):
+		"""
+		Sequence number of slot @number, which goes up with every store(), set() and touch()
+		"""
+		return struct.unpack_from('<Q', self._memory.buf, self._offset(number) + _SEQUENCE)[0]
+
+	def set(self, number, coord, symbol):
+		"""
+		Write one cell of slot @number and bump its sequence number
+		"""
+		header = self.header(number)
+		if not (coord[0] > -1 and coord[0] < header['x_dim'] and coord[1] > -1 and coord[1] < header['y_dim']):
+			raise IndexError('{} is outside the floor'.format(coord))
+
+		self._memory.buf[self._offset(number) + _FLOOR.size + coord[1] * header['x_dim'] + coord[0]] = CODES[symbol]
+		self.touch(number)
+
+	def touch(self, number):
+		"""
+		Bump the sequence number of slot @number, after editing its cells through a shared Dungeon
+		"""
+		struct.pack_into('<Q', self._memory.buf, self._offset(number) + _SEQUENCE, self.sequence(number) + 1)
+
+
+	'''
+	Helpers
+	'''
+	def _offset(self, number):
+		if number < 0 or number >= self._floors:
+			raise IndexError('There is no floor slot {}'.format(number))
+
+		return _HEADER.size + number * self._slot
\ No newline at end of file
@@ -0,0 +1,182 @@
+import hashlib, time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from Dungeon import Dungeon
+from Dungeon import Floor
+
+
+'''
+Floor generation in the background worker
+
+Floors travel back as RAW floor bytes, with their rooms and RNG state, and the time spent generating them
+'''
+def _generateFloor(params, seed):
+	start = time.perf_counter()
+	dungeon = Dungeon.generate(params, seed)
+
+	return Floor.pack(dungeon, Floor.RAW, state = True), time.perf_counter() - start
+
+
+'''
+A lazily generated, endless tower of floors
+
+Every floor is derived from the tower seed, so it can be dropped and rebuilt identically at any time
+Only @window floors are kept in memory, least recently visited evicted first, and the floors above and below the current one are generated in the background
+	@_floors maps a floor number to its Dungeon, least recently visited first
+	@_pending maps a floor number to the future generating it
+'''
+class Tower(object):
+	def __init__(self, seed, params = None, window = 8, cache = None, executor = None):
+		"""
+		@params is a parameter dictionary for every floor, or a function from a floor number to one; the defaults (see PARAMS) when None
+		"""
+		params = {} if params == None else params
+
+		self._seed = seed
+		self._params = params if callable(params) else (lambda floor: params)
+		self._window = max(window, 3)
+		self._cache = cache
+
+		self._executor = executor if not executor == None else ProcessPoolExecutor(max_workers = 1)
+		self._ownsExecutor = executor == None
+
+		self._floors = OrderedDict()
+		self._pending = {}
+		self._current = None
+
+		# Statistics
+		self._hits, self._misses = 0, 0
+		self._latency = {}
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+	def close(self):
+		for future in self._pending.values():
+			future.cancel()
+		self._pending.clear()
+
+		if self._ownsExecutor:
+			self._executor.shutdown(wait = True)
+
+
+	'''
+	Moving through the tower
+	'''
+	@property
+	def current(self):
+		return self._current
+
+	def floor(self, number):
+		"""
+		Go to floor @number, waiting only if it was neither in memory nor already generated in the background
+		"""
+		if number < 0:
+			raise IndexError('There is nothing below floor 0')
+
+		# Drop prefetches for floors that will no longer be next door before anything else, so that a jump does not queue behind them
+		for other in list(self._pending):
+			if abs(other - number) > 1:
+				if self._pending[other].done():
+					self._collect(other)
+				elif self._pending[other].cancel():
+					del self._pending[other]
+
+		if number in self._floors:
+			self._hits += 1
+		elif number in self._pending and self._pending[number].done():
+			self._hits += 1
+			self._collect(number)
+		else:
+			self._misses += 1
+			self._request(number)
+			self._collect(number)
+
+		self._floors.move_to_end(number)
+		self._current = number
+
+		# Get the stairs ready in both directions
+		for neighbour in (number + 1, number - 1):
+			if neighbour > -1 and not neighbour in self._floors:
+				self._request(neighbour)
+
+		self._evict()
+		return self._floors[number]
+
+	def climb(self):
+		return self.floor(0 if self._current == None else self._current + 1)
+
+	def descend(self):
+		return self.floor(0 if self._current == None else self._current - 1)
+
+	def floorSeed(self, number):
+		"""
+		Seed of floor @number, derived from the tower seed
+		"""
+		digest = hashlib.sha256('{}/{}'.format(self._seed, number).encode('utf-8')).digest()
+		return int.from_bytes(digest[:4], 'little')
+
+
+	'''
+	Statistics
+	'''
+	def stats(self):
+		"""
+		Prefetch hit rate and the seconds spent generating each floor that had to be generated
+		"""
+		visits = self._hits + self._misses
+
+		return {
+			'hits': self._hits,
+			'misses': self._misses,
+			'hitRate': self._hits / visits if visits > 0 else 0.0,
+			'resident': sorted(self._floors),
+			'pending': sorted(self._pending),
+			'latency': dict(self._latency)
+		}
+
+
+	'''
+	Helpers
+	'''
+	def _request(self, number):
+		if number in self._pending or number in self._floors:
+			return
+
+		params, seed = self._params(number), self.floorSeed(number)
+
+		if not self._cache == None:
+			dungeon = self._cache.get(params, seed)
+			if not dungeon == None:
+				self._floors[number] = dungeon
+				return
+
+		self._pending[number] = self._executor.submit(_generateFloor, params, seed)
+
+	def _collect(self, number):
+		if number in self._floors:
+			return
+
+		data, seconds = self._pending.pop(number).result()
+		dungeon = Floor.unpack(data)
+
+		self._floors[number] = dungeon
+		self._latency[number] = seconds
+
+		if not self._cache == None:
+			self._cache.put(dungeon, dungeon.params, dungeon.seed)
+
+	def _evict(self):
+		# Keep the current floor and its neighbours, even if they were visited long ago
+		keep = (self._current - 1, self._current, self._current + 1)
+
+		for number in list(self._floors):
+			if len(self._floors) <= self._window:
+				break
+
+			if not number in keep:
+				del self._floors[number]
\ No newline at end of file
@@ -1,259 +1,720 @@
-import math, random
-import operator
-
-
-from Dungeon.Components.Sets.CoordinateSet import CoordinateSet
-from Dungeon.Components.Sets.CoordinateSubset import CoordinateSubset
-
-from Dungeon.Components.CardinalDirection import Direction
-
-
-# Define maze property constants
-DEFAULT = ' '
-WALL = 'W'
-ROOM = 'R'
-DOOR = 'D'
-LOCKED = 'L'
-ITEM = '?'
-DEAD_ZONE = 'X'
-DOWN_STAIRS = 'v'
-UP_STAIRS = '^'
-PATH = '█'
-
-
-'''
-The Dungeon
-'''
-class Dungeon(object):
-	def __init__(self, x_dim, y_dim):
-		self._xDim = x_dim
-		self._yDim = y_dim
-		
-		'''
-		Used for building the dungeon
-		'''
-		self.__assets = {
-			'available': CoordinateSet()
-		}
-
-		# Generate a default dungeon (no assets)
-		self._dungeon = [DEFAULT] * x_dim
-		for x in range(0, x_dim):
-			self._dungeon[x] = [DEFAULT] * y_dim
-
-			for y in range(0, y_dim):
-				self.__assets['available'].add([x, y])
-		
-		'''
-		Dungeon defaults
-		'''
-		# Room placement tries
-		self._tryPlaceRoom = 50
-		self._maxRoomAmount = 20
-		
-		# Room size
-		self._roomMinX = 2
-		self._roomMaxX = 8
-		self._roomMinY = 2
-		self._roomMaxY = 8
-	
-	@classmethod
-	def fromMap(cls, mapfile):
-		f, lines = open(mapfile, 'r'), f.readlines()
-		
-		x_dim, y_dim = len(lines[0]), len(lines)
-		dungeon = cls(x_dim, y_dim)
-		
-		for x in range(0, x_dim):
-			for y in range(0, y_dim):
-				dungeon._dungeon[x][y] = lines[y][x]
-
-				if lines[y][x] == DEFAULT:
-					dungeon.__assets['available'].add([x, y])
-		
-		f.close()
-	
-	
-	'''
-	Set generator parameters
-	'''
-	def setRoomSize(self, **kwargs):
-		for key, value in kwargs.items():
-			if key == 'minX':
-				self._roomMinX = value if value > 0 and value < self._xDim else self._roomMinX
-			elif key == 'maxX':
-				self._roomMaxX = value if value > 0 and value < self._xDim else self._roomMaxX
-			elif key == 'minY':
-				self._roomMinY = value if value > 0 and value < self._yDim else self._roomMinY
-			elif key == 'maxY':
-				self._roomMaxY = value if value > 0 and value < self._yDim else self._roomMaxY
-	
-	def setNumTries(self, num_tries):
-		if num_tries > 0:
-			self._tryPlaceRoom = num_tries
-
-	def setRoomAmount(self, room_amount):
-		if room_amount > 0:
-			self._maxRoomAmount = room_amount
-	
-	
-	'''
-	Generate a dungeon
-	'''
-	# Add rooms to the dungeon
-	# Chance to randomly place rooms right next to other rooms to "extend" them with probability @bias
-	def createRooms(self, bias = 0.5):
-		tries, numRooms = 0, 0
-		
-		while tries < self._tryPlaceRoom and numRooms < self._maxRoomAmount:
-			x, y = random.randrange(1, self._xDim), random.randrange(1, self._yDim)
-			
-			# Continue if the coordinate is in bounds
-			if x + self._roomMinX < self._xDim - 1 and y + self._roomMinY < self._yDim - 1:
-				try:
-					roomX = random.randrange(self._roomMinX, min(self._roomMaxX, self._xDim - 1 - x))
-					roomY = random.randrange(self._roomMinY, min(self._roomMaxY, self._yDim - 1 - y))
-					
-					# Check for overlap
-					overlap = False
-					for xCoord in range(x - (0 if random.random() < bias else 1), x + roomX + 1 + (0 if random.random() < bias else 1)):
-						for yCoord in range(y - (0 if random.random() < bias else 1), y + roomY + 1 + (0 if random.random() < bias else 1)):
-							overlap = overlap or self._isOccupied(tuple([xCoord, yCoord]))
-							
-							if overlap:
-								break
-						
-						if overlap:
-							break
-					
-					# Create the room
-					if not overlap:
-						for xCoord in range(x, x + roomX + 1):
-							for yCoord in range(y, y + roomY + 1):
-								self._dungeon[xCoord][yCoord] = ROOM
-						numRooms += 1
-				except ValueError:
-					# Not enough space to add a room
-					pass
-				finally:
-					# End of current attempt
-					tries += 1
-	
-	# Add a corridor maze using a "growing tree" algorithm
-	# param@bias indicates whether the algorithm will look like a recursive backtracker (> 0.5) or Prim's algorithm (< 0.5)
-	def createMaze(self, bias = 1.0):
-		# Enqueue cells to check
-		cells = [self._getStart()]
-
-		while len(cells) > 0:
-			# Select the next index, randomly deciding between first or last
-			useCell = int(len(cells) * random.uniform(bias, 1.0)) if bias < 1.0 else len(cells) - 1
-
-			# Find all valid directions
-			nextCells = []
-			srcCell = cells[useCell]
-
-			self._addToWorkingSet(nextCells, srcCell, 'n')
-			self._addToWorkingSet(nextCells, srcCell, 'e')
-			self._addToWorkingSet(nextCells, srcCell, 's')
-			self._addToWorkingSet(nextCells, srcCell, 'w')
-
-			# Randomly pick a direction
-			while len(nextCells) > 0:
-				destCell = nextCells.pop(random.randrange(0, len(nextCells)))
-				direction = Direction.getKey(tuple(map(operator.sub, destCell, srcCell)))
-
-				# Place a WALL instead of a PATH if the cell is surrounded
-				if self._isSurrounded(destCell, direction):
-					self._dungeon[destCell[0]][destCell[1]] = WALL
-				else:
-					self._dungeon[destCell[0]][destCell[1]] = PATH
-
-					# Go backwards and set the left and right WALLs (if possible) for the previous cell
-					srcLeft = Direction.moveFrom(srcCell, Direction.turnLeftAsKey(direction))
-					if self._isInBounds(srcLeft) and not self._isOccupied(srcLeft):
-						self._dungeon[srcLeft[0]][srcLeft[1]] = WALL
-
-					srcRight = Direction.moveFrom(srcCell, Direction.turnRightAsKey(direction))
-					if self._isInBounds(srcRight) and not self._isOccupied(srcRight):
-						self._dungeon[srcRight[0]][srcRight[1]] = WALL
-
-					# Enqueue the cell and exit the loop
-					cells.append(destCell)
-					break
-
-			if len(nextCells) == 0:
-				cells.pop(useCell)
-
-
-	'''
-	Maze generator utilities
-	'''
-	# Randomly select a starting point, ensuring that the location selected is DEFAULT
-	def _getStart(self):
-		start = None
-		valid = (not start == None)
-
-		while not valid:
-			start = [random.randrange(0, self._xDim), random.randrange(0, self._yDim)]
-
-			valid = (not start == None) and not self._isOccupied(start) \
-					and not self._isOccupied(Direction.moveFrom(start, 'n')) \
-					and not self._isOccupied(Direction.moveFrom(start, 'e')) \
-					and not self._isOccupied(Direction.moveFrom(start, 's')) \
-					and not self._isOccupied(Direction.moveFrom(start, 'w'))
-
-		self._dungeon[start[0]][start[1]] = PATH
-		return tuple(start)
-
-	# Construct the set of valid directions
-	def _addToWorkingSet(self, working_set, coord, direction):
-		test = Direction.moveFrom(coord, direction)
-		if self._isInBounds(test) and not self._isOccupied(test):
-			working_set.append(test)
-
-	# Check if a cell is in bounds
-	def _isInBounds(self, coord):
-		return coord[0] > -1 and coord[0] < self._xDim and coord[1] > -1 and coord[1] < self._yDim
-
-	# Check if a cell is occupied (not DEFAULT or out of bounds)
-	def _isOccupied(self, coord):
-		try:
-			return self._dungeon[coord[0]][coord[1]] != DEFAULT
-		except IndexError:
-			return True
-
-	# Check if a cell comes into contact with an existing feature (forward, left, and right are not a WALL, DEFAULT, or out of bounds)
-	def _isSurrounded(self, coord, direction):
-		forward = Direction.moveFrom(coord, direction)
-		if self._isInBounds(forward) and self._dungeon[forward[0]][forward[1]] != DEFAULT and self._dungeon[forward[0]][forward[1]] != WALL:
-			return True
-
-		left = Direction.moveFrom(coord, Direction.turnLeftAsKey(direction))
-		if self._isInBounds(left) and self._dungeon[left[0]][left[1]] != DEFAULT and self._dungeon[left[0]][left[1]] != WALL:
-			return True
-
-		right = Direction.moveFrom(coord, Direction.turnRightAsKey(direction))
-		if self._isInBounds(right) and self._dungeon[right[0]][right[1]] != DEFAULT and self._dungeon[right[0]][right[1]] != WALL:
-			return True
-
-		return False
-
-
-	'''
-	Representation of dungeon in ASCII
-	'''
-	def __str__(self):
-		out = ""
-		
-		for y in range(0, self._yDim):
-			for x in range(0, self._xDim):
-				out += self._dungeon[x][y]
-				
-			out += '\n'
-		
-		return out
-
-
-if __name__ == '__main__':
+import random, time
+from array import array
+from collections import deque
+
+
+from Dungeon.Components.Sets.CoordinateSet import CoordinateSet
+
+from Dungeon.Components.Automaton import Automaton
+from Dungeon.Components.Bitsets import table, setBits
+from Dungeon.Components.CardinalDirection import Direction
+from Dungeon.Components.FieldOfView import FieldOfView
+from Dungeon.Components.Grid import Grid
+from Dungeon.Components.NeighbourMasks import NeighbourMasks
+from Dungeon.Components.OccupancyIndex import OccupancyIndex
+from Dungeon.Components.Pathfinder import Pathfinder
+from Dungeon.Components.Regions import Regions
+from Dungeon.Components.UnionFind import UnionFind
+from Dungeon.Components.Assets.Room import Room
+
+# Maze property constants
+from Dungeon.Components.Symbols import DEFAULT, WALL, ROOM, DOOR, LOCKED, ITEM, DEAD_ZONE, DOWN_STAIRS, UP_STAIRS, PATH
+from Dungeon.Components.Symbols import CODES, PASSABLE
+
+
+# Bump whenever a change to the generator changes the floor built from the same parameters and seed
+GENERATOR_VERSION = 4
+
+# Generator parameters understood by Dungeon.generate, with their defaults
+PARAMS = {
+	'x_dim': 119,
+	'y_dim': 47,
+	'minX': 2,
+	'maxX': 8,
+	'minY': 2,
+	'maxY': 8,
+	'numTries': 50,
+	'roomAmount': 20,
+	'roomBias': 0.5,
+	'guarantee': False,
+	'mazeBias': 1.0
+}
+
+
+'''
+The Dungeon
+
+All randomness goes through the dungeon's own RNG, so the same @seed and the same calls always build the same floor
+'''
+class Dungeon(object):
+	def __init__(self, x_dim, y_dim, seed = None, grid = None):
+		self._xDim = x_dim
+		self._yDim = y_dim
+
+		# Draw a seed when none is given so that every floor can still be reproduced
+		self._seed = seed if not seed == None else random.randrange(0, 2 ** 32)
+		self._random = random.Random(self._seed)
+		
+		'''
+		Used for building the dungeon
+		'''
+		self.__assets = {
+			# Every DEFAULT cell, built from the grid on first use (see _available), as many floors never draw from it
+			'available': None
+		}
+
+		# Generate a default dungeon (no assets), one byte per cell, unless an existing grid is given
+		self._dungeon = grid if not grid == None else Grid(x_dim, y_dim)
+
+		# Parameters the floor was generated from, if it came from generate()
+		self._params = {}
+
+		# Registered rooms, room i has id i + 1, and the id of the room over every cell (0 for none), allocated with the first room
+		self._rooms = []
+		self._roomIds = None
+
+		# Column segments of rooms saved with a floor file, registered the first time rooms are needed (see _restoreRooms)
+		self._savedRooms = None
+
+		# Cached distance and flow fields, and cached fields of view, over the grid, created on first use (see paths and sight)
+		self._paths = None
+		self._sight = None
+
+		# Instrumentation, off unless turned on with instrument()
+		self._stats = None
+		self._listener = None
+		
+		'''
+		Dungeon defaults
+		'''
+		# Room placement tries
+		self._tryPlaceRoom = 50
+		self._maxRoomAmount = 20
+		
+		# Room size
+		self._roomMinX = 2
+		self._roomMaxX = 8
+		self._roomMinY = 2
+		self._roomMaxY = 8
+	
+	@classmethod
+	def generate(cls, params, seed = None, cache = None):
+		"""
+		Build a floor from a dictionary of generator parameters (see PARAMS), running createRooms and createMaze
+
+		With a FloorCache, a floor already generated for the same parameters and seed is loaded instead, with its rooms and RNG state, so later stages run the same on it
+		"""
+		params = dict(PARAMS, **params)
+		seed = seed if not seed == None else random.randrange(0, 2 ** 32)
+
+		if not cache == None:
+			dungeon = cache.get(params, seed)
+			if not dungeon == None:
+				return dungeon
+
+		dungeon = cls(params['x_dim'], params['y_dim'], seed)
+		dungeon.setRoomSize(minX = params['minX'], maxX = params['maxX'], minY = params['minY'], maxY = params['maxY'])
+		dungeon.setNumTries(params['numTries'])
+		dungeon.setRoomAmount(params['roomAmount'])
+
+		dungeon.createRooms(params['roomBias'], params['guarantee'])
+		dungeon.createMaze(params['mazeBias'])
+
+		dungeon._params = params
+
+		if not cache == None:
+			cache.put(dungeon, params, seed)
+
+		return dungeon
+
+	@classmethod
+	def fromMap(cls, mapfile):
+		"""
+		Load a dungeon from its ASCII representation, padding short lines with DEFAULT
+		"""
+		with open(mapfile, 'r', encoding = 'utf-8') as f:
+			lines = f.read().splitlines()
+
+		# Ignore blank lines at the end of the file
+		while len(lines) > 0 and lines[-1] == '':
+			lines.pop()
+
+		x_dim = max([len(line) for line in lines]) if len(lines) > 0 else 0
+		grid = Grid.fromRows([line.ljust(x_dim, DEFAULT) for line in lines])
+
+		return cls(x_dim, len(lines), grid = grid)
+
+	def copy(self):
+		"""
+		An independent dungeon with the same cells, rooms, parameters and RNG state, so both go on to generate the same way
+
+		The Room objects themselves are shared, generation never changes a room once it is registered
+		"""
+		dungeon = Dungeon(self._xDim, self._yDim, self._seed, Grid.fromBuffer(self._xDim, self._yDim, bytearray(self._dungeon.view())))
+		dungeon._random.setstate(self._random.getstate())
+		dungeon._params = dict(self._params)
+
+		dungeon._rooms = list(self._rooms)
+		dungeon._savedRooms = self._savedRooms
+		dungeon._roomIds = None if self._roomIds == None else array('I', self._roomIds)
+
+		dungeon._tryPlaceRoom, dungeon._maxRoomAmount = self._tryPlaceRoom, self._maxRoomAmount
+		dungeon._roomMinX, dungeon._roomMaxX, dungeon._roomMinY, dungeon._roomMaxY = self._roomMinX, self._roomMaxX, self._roomMinY, self._roomMaxY
+
+		return dungeon
+
+
+	'''
+	Properties
+	'''
+	# Seed of the dungeon's RNG
+	@property
+	def seed(self):
+		return self._seed
+
+	# The compact grid backing the dungeon
+	@property
+	def grid(self):
+		return self._dungeon
+
+	# Generator parameters, empty unless the dungeon came from generate()
+	@property
+	def params(self):
+		return self._params
+
+	# Every registered room, in id order
+	@property
+	def rooms(self):
+		self._restoreRooms()
+		return list(self._rooms)
+
+	# Per-phase timers and counters, or None unless instrumentation is on (see instrument)
+	@property
+	def stats(self):
+		return self._stats
+
+	# Pathfinder over the grid, kept in sync with every write the dungeon makes
+	@property
+	def paths(self):
+		if self._paths == None:
+			self._paths = Pathfinder(self._dungeon)
+
+		return self._paths
+
+	# Field of view over the grid, kept in sync like paths
+	@property
+	def sight(self):
+		if self._sight == None:
+			self._sight = FieldOfView(self._dungeon)
+
+		return self._sight
+
+
+	'''
+	Room registry
+	'''
+	# Draw a room into the dungeon and register it, returning its id
+	def addRoom(self, room):
+		self._restoreRooms()
+		room.render(self._dungeon)
+		roomId = self._registerRoom(room)
+
+		# Row by row, as the order cells leave the set decides which cells are sampled later
+		available = self.__assets['available']
+		if not available == None:
+			for y, first, last in room.rows():
+				available.discardRect((first, y), (last, y))
+
+		self._invalidate()
+
+		return roomId
+
+	# Register a room that is already drawn in the grid, returning its id
+	def _registerRoom(self, room):
+		self._rooms.append(room)
+		roomId = len(self._rooms)
+
+		if self._roomIds == None:
+			self._roomIds = array('I', [0]) * (self._xDim * self._yDim)
+
+		for x, first, last in room.segments():
+			self._roomIds[first * self._xDim + x:last * self._xDim + x + 1:self._xDim] = array('I', [roomId]) * (last - first + 1)
+
+		return roomId
+
+	# Register the rooms saved with a floor file, once, on first use, so that loading and rendering a floor never build them
+	def _restoreRooms(self):
+		if not self._savedRooms == None:
+			saved, self._savedRooms = self._savedRooms, None
+
+			for segments in saved:
+				self._registerRoom(Room.fromSegments(segments))
+
+	# Id of the room over a cell, or 0 if there is none
+	def roomId(self, coord):
+		self._restoreRooms()
+		if self._roomIds == None or not self._isInBounds(coord):
+			return 0
+
+		return self._roomIds[coord[1] * self._xDim + coord[0]]
+
+	# The room over a cell, or None
+	def roomAt(self, coord):
+		roomId = self.roomId(coord)
+		return None if roomId == 0 else self._rooms[roomId - 1]
+	
+	
+	'''
+	Set generator parameters
+	'''
+	def setRoomSize(self, **kwargs):
+		for key, value in kwargs.items():
+			if key == 'minX':
+				self._roomMinX = value if value > 0 and value < self._xDim else self._roomMinX
+			elif key == 'maxX':
+				self._roomMaxX = value if value > 0 and value < self._xDim else self._roomMaxX
+			elif key == 'minY':
+				self._roomMinY = value if value > 0 and value < self._yDim else self._roomMinY
+			elif key == 'maxY':
+				self._roomMaxY = value if value > 0 and value < self._yDim else self._roomMaxY
+	
+	def setNumTries(self, num_tries):
+		if num_tries > 0:
+			self._tryPlaceRoom = num_tries
+
+	def setRoomAmount(self, room_amount):
+		if room_amount > 0:
+			self._maxRoomAmount = room_amount
+	
+	
+	'''
+	Generate a dungeon
+	'''
+	# Add rooms to the dungeon, returning the number of rooms placed
+	# Chance to randomly place rooms right next to other rooms to "extend" them with probability @bias
+	# param@guarantee samples only from positions that can hold a room instead of making blind tries (see _placeRooms)
+	def createRooms(self, bias = 0.5, guarantee = False):
+		started = self._clock()
+		tries, numRooms, overlaps, cramped = 0, 0, 0, 0
+
+		# Index the cells that are already taken so each overlap test costs one bit test per row
+		occupancy = OccupancyIndex.fromGrid(self._dungeon)
+
+		if guarantee:
+			numRooms = self._placeRooms(bias, occupancy)
+			self._record('createRooms', started, rooms = numRooms)
+			return numRooms
+		
+		while tries < self._tryPlaceRoom and numRooms < self._maxRoomAmount:
+			# Only free cells can be the corner of a room
+			corner = self._available().sample(self._random)
+			if corner == None:
+				break
+
+			# Every draw is an attempt, even a corner too close to the edge to hold a room, so floors without room for one still stop
+			tries += 1
+			x, y = corner
+			
+			# Continue if the coordinate is in bounds
+			if x > 0 and y > 0 and x + self._roomMinX < self._xDim - 1 and y + self._roomMinY < self._yDim - 1:
+				try:
+					roomX = self._random.randrange(self._roomMinX, min(self._roomMaxX, self._xDim - 1 - x))
+					roomY = self._random.randrange(self._roomMinY, min(self._roomMaxY, self._yDim - 1 - y))
+					
+					# Check for overlap, leaving a 1-cell margin on each side unless it is dropped with probability @bias
+					left, right = (0 if self._random.random() < bias else 1), (0 if self._random.random() < bias else 1)
+					top, bottom = (0 if self._random.random() < bias else 1), (0 if self._random.random() < bias else 1)
+
+					# Create the room
+					if occupancy.isFree((x - left, y - top), (x + roomX + right, y + roomY + bottom)):
+						self._fillRoom(occupancy, (x, y), (x + roomX, y + roomY))
+						numRooms += 1
+					else:
+						overlaps += 1
+				except ValueError:
+					# Not enough space to add a room
+					cramped += 1
+
+		self._record('createRooms', started, tries = tries, rooms = numRooms, overlaps = overlaps, outOfSpace = cramped, outOfBounds = tries - numRooms - overlaps - cramped)
+		return numRooms
+
+	# Place _maxRoomAmount rooms, ignoring _tryPlaceRoom, by drawing each room from every position where it fits
+	# Falls back to the smallest room, then to the loosest margins @bias allows, and stops early only when even that fits nowhere
+	def _placeRooms(self, bias, occupancy):
+		numRooms = 0
+
+		# Largest room extents that keep the 1-cell border around the floor
+		maxX, maxY = min(self._roomMaxX - 1, self._xDim - 3), min(self._roomMaxY - 1, self._yDim - 3)
+		if maxX < self._roomMinX or maxY < self._roomMinY:
+			return numRooms
+
+		loosest = 0 if bias > 0 else 1
+
+		while numRooms < self._maxRoomAmount:
+			roomX, roomY = self._random.randrange(self._roomMinX, maxX + 1), self._random.randrange(self._roomMinY, maxY + 1)
+			margins = tuple([0 if self._random.random() < bias else 1 for i in range(0, 4)])
+
+			corner = None
+			for roomX, roomY, (left, right, top, bottom) in ((roomX, roomY, margins), (self._roomMinX, self._roomMinY, margins), (self._roomMinX, self._roomMinY, (loosest,) * 4)):
+				corners = occupancy.corners(roomX + 1 + left + right, roomY + 1 + top + bottom, (1 - left, 1 - top), (self._xDim - 2 + right, self._yDim - 2 + bottom))
+				corner = OccupancyIndex.sample(corners, self._random)
+
+				if not corner == None:
+					break
+
+			# Not even the smallest room fits anywhere, so no more rooms can be placed
+			if corner == None:
+				break
+
+			x, y = corner[0] + left, corner[1] + top
+			self._fillRoom(occupancy, (x, y), (x + roomX, y + roomY))
+			numRooms += 1
+
+		return numRooms
+
+	# Register a rectangular room and mark it in the occupancy index
+	def _fillRoom(self, occupancy, upperLeft, lowerRight):
+		roomId = self.addRoom(Room.createRect(upperLeft, lowerRight))
+		occupancy.occupy(upperLeft, lowerRight)
+
+		if not self._listener == None:
+			self._listener('room', {'id': roomId, 'upperLeft': upperLeft, 'lowerRight': lowerRight})
+	
+	# Add a corridor maze using a "growing tree" algorithm
+	# param@bias indicates whether the algorithm will look like a recursive backtracker (> 0.5) or Prim's algorithm (< 0.5)
+	def createMaze(self, bias = 1.0):
+		started = self._clock()
+
+		start = self._getStart()
+		if start == None:
+			# No room left for a maze
+			self._record('createMaze', started)
+			return
+
+		# Carve on neighbour masks, so that the free directions of a cell and whether it touches a feature are each one lookup
+		grid = NeighbourMasks(self._dungeon)
+		codes, masks, offsets, occupied, feature = grid.codes, grid.masks, grid.offsets, grid.occupied, grid.feature
+		OPEN, AROUND, LEFT, RIGHT = NeighbourMasks.OPEN, NeighbourMasks.AROUND, Direction.LEFT, Direction.RIGHT
+		wall, path = CODES[WALL], CODES[PATH]
+		north, south, east, west = offsets
+
+		# Unrolled @occupied and @feature, one name per direction
+		wallN, wallS, wallE, wallW = occupied
+		pathN, pathS, pathE, pathW = feature
+		uniform, randrange = self._random.uniform, self._random.randrange
+
+		# Enqueue cells to check
+		cells = [grid.index(start)]
+		carved, walls, backtracks, peak = 1, 0, 0, 1
+
+		while len(cells) > 0:
+			# Select the next index, randomly deciding between first or last
+			useCell = int(len(cells) * uniform(bias, 1.0)) if bias < 1.0 else len(cells) - 1
+
+			# Find all valid directions
+			srcCell = cells[useCell]
+			nextCells = list(OPEN[masks[srcCell]])
+
+			# Randomly pick a direction
+			while len(nextCells) > 0:
+				direction = nextCells.pop(randrange(0, len(nextCells)))
+				destCell = srcCell + offsets[direction]
+
+				# Place a WALL instead of a PATH if the cell is surrounded
+				if masks[destCell] & AROUND[direction]:
+					codes[destCell] = wall
+					masks[destCell + north] |= wallN
+					masks[destCell + south] |= wallS
+					masks[destCell + east] |= wallE
+					masks[destCell + west] |= wallW
+					walls += 1
+				else:
+					codes[destCell] = path
+					masks[destCell + north] |= pathN
+					masks[destCell + south] |= pathS
+					masks[destCell + east] |= pathE
+					masks[destCell + west] |= pathW
+
+					# Go backwards and set the left and right WALLs (if possible) for the previous cell
+					for side in (LEFT[direction], RIGHT[direction]):
+						if not masks[srcCell] & (1 << side):
+							wallCell = srcCell + offsets[side]
+							codes[wallCell] = wall
+							masks[wallCell + north] |= wallN
+							masks[wallCell + south] |= wallS
+							masks[wallCell + east] |= wallE
+							masks[wallCell + west] |= wallW
+							walls += 1
+
+					# Enqueue the cell and exit the loop
+					cells.append(destCell)
+					carved += 1
+					if len(cells) > peak:
+						peak = len(cells)
+					break
+
+			if len(nextCells) == 0:
+				cells.pop(useCell)
+				backtracks += 1
+
+		# Every cell the maze filled was DEFAULT, so rebuild rather than update the cell sets
+		grid.paint(self._dungeon)
+		self.__assets['available'] = None
+		self._invalidate()
+
+		self._record('createMaze', started, carved = carved, walls = walls, backtracks = backtracks, peakFrontier = peak)
+
+
+	# Fill the empty (DEFAULT) cells with caves of PATH walled in by WALL, by smoothing random noise with a cellular automaton
+	# param@fill is the starting chance of a cell being rock
+	# param@birth and param@survive are the numbers of rock neighbours (out of 8, beyond the edge counts as rock) that turn an open cell to rock and that keep a rock cell as rock
+	# Cells already on the floor stay as they are, passable ones (rooms placed with createRooms first) counting as open cave; returns the number of PATH cells
+	def createCaves(self, fill = 0.45, birth = (5, 6, 7, 8), survive = (4, 5, 6, 7, 8), iterations = 4):
+		started = self._clock()
+
+		automaton = Automaton(self._dungeon)
+		automaton.randomize(self._random, fill)
+
+		for i in range(0, iterations):
+			automaton.step(birth, survive)
+
+		automaton.paint(self._dungeon, CODES[WALL], CODES[PATH])
+
+		# Every DEFAULT cell was written, so rebuild rather than update the cell sets
+		self.__assets['available'] = None
+		self._invalidate()
+
+		carved = automaton.openCount()
+		self._record('createCaves', started, carved = carved)
+		return carved
+
+	# Join the separate regions of the floor (rooms, corridors) with DOORs through the WALL or DEFAULT cells between them
+	# param@extra is the chance of opening a door between regions that are already joined, which adds loops
+	# Returns the number of doors placed; the floor is fully connected unless some regions have no wall in common with the rest
+	def connectRegions(self, extra = 0.0):
+		started = self._clock()
+
+		regions = Regions(self._dungeon)
+		candidates = regions.connectors(self._dungeon, (DEFAULT, WALL))
+		self._random.shuffle(candidates)
+
+		# Kruskal's algorithm over the regions, with every candidate weighted at random
+		sets = UnionFind(regions.count + 1)
+
+		doors, pieces = 0, regions.count
+		for i, a, b in candidates:
+			if sets.union(a, b):
+				pieces -= 1
+			elif pieces == 1 and extra <= 0:
+				break
+			elif self._random.random() >= extra:
+				continue
+
+			self._setCell((i % self._xDim, i // self._xDim), DOOR)
+			doors += 1
+
+		self._record('connectRegions', started, regions = regions.count, candidates = len(candidates), doors = doors, unjoined = pieces - 1)
+		return doors
+
+	# Fill in dead-end corridors, peeling each one back to the junction it branches off
+	# param@sparseness is the chance that any given dead end is removed, 1.0 removes them all
+	# Returns the number of cells removed
+	def removeDeadEnds(self, sparseness = 1.0):
+		started = self._clock()
+		xDim, yDim = self._xDim, self._yDim
+		cells = self._dungeon.cells
+
+		# Seed the worklist with every dead end in one scan: PATH or DOOR cells with at most one passable neighbour
+		ends = self._dungeon.bits((PATH, DOOR))
+		walkable = self._dungeon.bits(PASSABLE)
+		work = deque()
+
+		for y in range(0, yDim):
+			n, s = walkable[y - 1] if y > 0 else 0, walkable[y + 1] if y < yDim - 1 else 0
+			e, w = walkable[y] >> 1, walkable[y] << 1
+			twoOrMore = (n & s) | (n & e) | (n & w) | (s & e) | (s & w) | (e & w)
+
+			for x in setBits(ends[y] & ~twoOrMore):
+				if self._random.random() < sparseness:
+					work.append(y * xDim + x)
+
+		# Peel, re-enqueueing only the neighbours whose degree went down
+		passable = table(PASSABLE)
+		peelable = (CODES[PATH], CODES[DOOR])
+
+		removed = 0
+		while len(work) > 0:
+			i = work.popleft()
+			if not cells[i] in peelable:
+				continue
+
+			x = i % xDim
+			neighbours = [j for j in (i - xDim if i >= xDim else -1, i + xDim if i < (yDim - 1) * xDim else -1, i - 1 if x > 0 else -1, i + 1 if x < xDim - 1 else -1) if j > -1 and passable[cells[j]]]
+
+			if len(neighbours) <= 1:
+				self._setCell((x, i // xDim), WALL)
+				removed += 1
+				work.extend(neighbours)
+
+		self._record('removeDeadEnds', started, removed = removed)
+		return removed
+
+	# Put UP_STAIRS and DOWN_STAIRS as far apart as the floor allows, by walking: UP_STAIRS on the cell farthest from a random passable cell, DOWN_STAIRS on the cell farthest from UP_STAIRS
+	# Only the region holding the random cell is considered, so connect the floor first
+	# Returns the (up, down) coordinates, or None if there are fewer than two passable cells to put them on
+	def placeStairs(self):
+		started = self._clock()
+
+		walk = self._dungeon.read().translate(table(PASSABLE))
+
+		i = walk.find(1, self._random.randrange(0, len(walk))) if len(walk) > 0 else -1
+		i = i if i > -1 else walk.find(1)
+		if i < 0:
+			return None
+
+		up = self.paths.farthest((i % self._xDim, i // self._xDim))[0]
+		down, distance = self.paths.farthest(up)
+		if distance == 0:
+			return None
+
+		self._setCell(up, UP_STAIRS)
+		self._setCell(down, DOWN_STAIRS)
+
+		self._record('placeStairs', started, distance = distance)
+		return (up, down)
+
+	# Scatter up to @amount ITEMs over the floors of the registered rooms, picking a room and then a cell in it at random
+	# Returns the number of items placed
+	def placeItems(self, amount = 10):
+		started = self._clock()
+		segments = [list(room.segments()) for room in self.rooms if len(room) > 0]
+		room, placed = CODES[ROOM], 0
+
+		for tries in range(0, amount * 10 if len(segments) > 0 else 0):
+			if placed == amount:
+				break
+
+			x, first, last = self._random.choice(self._random.choice(segments))
+			coord = (x, self._random.randint(first, last))
+
+			if self._dungeon.cells[self._dungeon.index(coord)] == room:
+				self._setCell(coord, ITEM)
+				placed += 1
+
+		self._record('placeItems', started, items = placed)
+		return placed
+
+
+	'''
+	Instrumentation
+	'''
+	# Start collecting per-phase timers and counters into stats, or stop and drop them with @enabled False
+	# param@callback is called as callback(event, info) for every 'room' placed and every 'phase' finished, even with @enabled False
+	def instrument(self, enabled = True, callback = None):
+		self._stats = ({} if self._stats == None else self._stats) if enabled else None
+		self._listener = callback
+
+	# Start time of a phase, or 0 when nothing is listening so that a phase costs no clock reads
+	def _clock(self):
+		return time.perf_counter() if not (self._stats == None and self._listener == None) else 0.0
+
+	# Fold a finished phase's time and counters into stats, keeping the largest value of 'peak' counters instead of the sum
+	def _record(self, phase, started, **counters):
+		if self._stats == None and self._listener == None:
+			return
+
+		seconds = time.perf_counter() - started
+
+		if not self._stats == None:
+			entry = self._stats.setdefault(phase, {'calls': 0, 'seconds': 0.0})
+			entry['calls'] += 1
+			entry['seconds'] += seconds
+
+			for key, value in counters.items():
+				entry[key] = max(entry.get(key, 0), value) if key.startswith('peak') else entry.get(key, 0) + value
+
+		if not self._listener == None:
+			self._listener('phase', dict(counters, phase = phase, seconds = seconds))
+
+
+	'''
+	Maze generator utilities
+	'''
+	# Randomly select a starting point, ensuring that the location selected and its neighbours are DEFAULT
+	# Returns None if there is no such location
+	def _getStart(self):
+		started = self._clock()
+		available = self._available()
+
+		# Draw from the DEFAULT cells, only rejecting those with an occupied neighbour
+		tries, scans = 0, 0
+		for tries in range(0, len(available)):
+			start = available.sample(self._random)
+			if self._isStart(start):
+				break
+		else:
+			# Rejections kept happening, so the floor is nearly full; settle it with one pass
+			start = next((coord for coord in available if self._isStart(coord)), None)
+			tries, scans = len(available), 1
+
+		self._record('getStart', started, rejections = tries, scans = scans)
+
+		if start == None:
+			return None
+
+		self._setCell(start, PATH)
+		return start
+
+	def _isStart(self, coord):
+		for direction in Direction.CARDINALS:
+			if self._isOccupied(Direction.step(coord, direction)):
+				return False
+
+		return True
+
+	def _available(self):
+		if self.__assets['available'] == None:
+			self.__assets['available'] = CoordinateSet.fromGrid(self._dungeon)
+
+		return self.__assets['available']
+
+	# Write a single cell, keeping 'available' (once it is built), the cached paths and the fields of view up to date
+	def _setCell(self, coord, symbol):
+		self._dungeon.set(coord, symbol)
+
+		available = self.__assets['available']
+		if not available == None:
+			if symbol == DEFAULT:
+				available.add(coord)
+			else:
+				available.discard(coord)
+
+		self._invalidate(coord)
+
+	# Tell the cached paths and fields of view that @coord changed, or that anything may have changed when no @coord is given
+	def _invalidate(self, coord = None):
+		if not self._paths == None:
+			self._paths.invalidate(coord)
+		if not self._sight == None:
+			self._sight.invalidate(coord)
+
+	# Check if a cell is in bounds
+	def _isInBounds(self, coord):
+		return self._dungeon.inBounds(coord)
+
+	# Check if a cell is occupied (not DEFAULT or out of bounds)
+	def _isOccupied(self, coord):
+		# DEFAULT is code 0
+		return not self._dungeon.inBounds(coord) or self._dungeon.cells[self._dungeon.index(coord)] != 0
+
+
+
+	'''
+	Representation of dungeon in ASCII
+	'''
+	def __str__(self):
+		return str(self._dungeon)
+
+
+if __name__ == '__main__':
 	pass
\ No newline at end of file
@@ -1,18 +1,205 @@
-import sys, yaml
-from config import settings
-
-
-from Dungeon import Dungeon
-
-from tests.generate_dungeon import run
-
-
-def run_tests(tests):
-	run()
-
-
-if __name__ == '__main__':
-	if settings['env'] == 'DEV':
-		run_tests(settings['tests'])
-	elif settings['env'] = 'PROD':
-		pass
\ No newline at end of file
+import argparse, json, os, sys
+
+
+'''
+Command line entry point
+
+Only argparse is imported up front; every subcommand imports what it needs when it runs, so short-lived workers start fast
+	generate	one floor, as text or a floor file, to stdout or a file
+	batch	many floors on a process pool, streamed out as they finish
+	render	floor or map files to text or images
+	bench	the generator benchmarks (tests/benchmark.py)
+
+Binary output to stdout is a stream of records, each a 4-byte little-endian length followed by that many bytes, so pipelines can split it
+With no subcommand, config.yml decides: the DEV environment runs the tests
+'''
+def run_tests(tests):
+	from tests.generate_dungeon import run
+	run()
+
+
+'''
+Output
+'''
+FORMATS = ('text', 'floor', 'png', 'ppm')
+
+def _format(path, default):
+	# The file extension decides, unless a format was asked for
+	for name, extension in (('png', '.png'), ('ppm', '.ppm'), ('floor', '.floor'), ('text', '.txt')):
+		if not path in (None, '-') and path.lower().endswith(extension):
+			return name
+
+	return default or 'text'
+
+def _encode(dungeon, kind, encoding = 1, scale = 1):
+	if kind == 'text':
+		return str(dungeon).encode('utf-8')
+	elif kind == 'floor':
+		from Dungeon import Floor
+		return Floor.pack(dungeon, encoding)
+
+	from Dungeon import Preview
+	image = Preview.indexed(dungeon, scale)
+	return Preview.png(image) if kind == 'png' else Preview.ppm(image)
+
+def _write(data, path, kind):
+	if path in (None, '-'):
+		out = sys.stdout.buffer
+		if kind != 'text':
+			out.write(len(data).to_bytes(4, 'little'))
+		out.write(data)
+		out.flush()
+	else:
+		with open(path, 'wb') as f:
+			f.write(data)
+
+def _quietly(command, *args):
+	"""
+	Run a subcommand, stopping without a traceback if the reader of stdout goes away, as when piped into head
+	"""
+	try:
+		return command(*args) or 0
+	except BrokenPipeError:
+		# Python flushes stdout again on exit, so point it at devnull first or that flush raises too
+		devnull = os.open(os.devnull, os.O_WRONLY)
+		os.dup2(devnull, sys.stdout.fileno())
+		return 1
+
+def _params(pairs):
+	"""
+	Generator parameters from key=value pairs, values read as JSON where they parse
+	"""
+	params = {}
+	for pair in pairs or []:
+		key, value = pair.split('=', 1)
+		try:
+			params[key] = json.loads(value)
+		except ValueError:
+			params[key] = value
+
+	return params
+
+
+'''
+Subcommands
+'''
+def generate(args):
+	from Dungeon import Dungeon
+
+	cache = None
+	if args.cache:
+		from Dungeon.FloorCache import FloorCache
+		cache = FloorCache(args.cache)
+
+	dungeon = Dungeon.generate(_params(args.param), args.seed, cache)
+	kind = _format(args.output, args.format)
+	_write(_encode(dungeon, kind, args.encoding, args.scale), args.output, kind)
+
+def batch(args):
+	import os
+	from Dungeon import Batch, Floor
+
+	start, count = [int(n) for n in args.seeds.split(':')] if ':' in args.seeds else (0, int(args.seeds))
+	kind = args.format or 'floor'
+
+	# Text and images are made from the unpacked floor in this process, floor files go out exactly as the workers packed them
+	for n, data in enumerate(Batch.packMany(_params(args.param), range(start, start + count), args.workers, args.encoding)):
+		if kind != 'floor':
+			data = _encode(Floor.unpack(data), kind, scale = args.scale)
+
+		path = '-'
+		if args.directory:
+			os.makedirs(args.directory, exist_ok = True)
+			path = os.path.join(args.directory, '{}.{}'.format(start + n, 'txt' if kind == 'text' else kind))
+		elif kind == 'text':
+			# Separate the maps on stdout with a blank line
+			data += b'\n'
+
+		_write(data, path, kind)
+
+def render(args):
+	import os
+	from Dungeon import Dungeon, Floor
+
+	dungeons = [Dungeon.fromMap(path) if path.lower().endswith('.txt') else Floor.load(path) for path in args.inputs]
+	kind = _format(args.output, args.format)
+
+	if args.sheet:
+		from Dungeon import Preview
+		image = Preview.contactSheet(dungeons, args.columns, args.scale)
+		_write(Preview.png(image) if kind == 'png' else Preview.ppm(image), args.output, kind)
+		return
+
+	# Several floors cannot share one output file, so number them: out.png becomes out-0.png, out-1.png and so on
+	for n, dungeon in enumerate(dungeons):
+		path = args.output
+		if len(dungeons) > 1 and not path in (None, '-'):
+			root, extension = os.path.splitext(path)
+			path = '{}-{}{}'.format(root, n, extension)
+
+		_write(_encode(dungeon, kind, args.encoding, args.scale), path, kind)
+
+def bench(args, rest):
+	from tests import benchmark
+	return benchmark.main(rest)
+
+
+def main(argv = None):
+	parser = argparse.ArgumentParser(prog = 'TowerOfTrials', description = 'Generate, render and benchmark dungeon floors')
+	commands = parser.add_subparsers(dest = 'command')
+
+	common = argparse.ArgumentParser(add_help = False)
+	common.add_argument('-p', '--param', action = 'append', metavar = 'KEY=VALUE', help = 'generator parameter, repeatable')
+	common.add_argument('-f', '--format', choices = FORMATS)
+	common.add_argument('--encoding', type = int, default = 1, help = 'floor file cell encoding: 0 raw, 1 nibble, 2 run-length')
+	common.add_argument('--scale', type = int, default = 1, help = 'image pixels per cell')
+
+	command = commands.add_parser('generate', parents = [common], help = 'generate one floor')
+	command.add_argument('-s', '--seed', type = int)
+	command.add_argument('-o', '--output', default = '-')
+	command.add_argument('--cache', help = 'floor cache directory')
+
+	command = commands.add_parser('batch', parents = [common], help = 'generate many floors')
+	command.add_argument('seeds', help = 'COUNT seeds from 0, or START:COUNT')
+	command.add_argument('-d', '--directory', help = 'write one file per floor here instead of streaming to stdout')
+	command.add_argument('-w', '--workers', type = int)
+
+	command = commands.add_parser('render', parents = [common], help = 'render floor files or text maps')
+	command.add_argument('inputs', nargs = '+')
+	command.add_argument('-o', '--output', default = '-', help = 'with several inputs and no --sheet, a file name is numbered per input')
+	command.add_argument('--sheet', action = 'store_true', help = 'tile every input into one contact sheet')
+	command.add_argument('--columns', type = int)
+
+	commands.add_parser('bench', help = 'run the benchmarks, any further options go to tests/benchmark.py', add_help = False)
+
+	args, rest = parser.parse_known_args(argv)
+
+	if args.command == 'bench':
+		return _quietly(bench, args, rest)
+	elif len(rest) > 0:
+		parser.error('unrecognized arguments: {}'.format(' '.join(rest)))
+
+	for pair in getattr(args, 'param', None) or []:
+		if not '=' in pair:
+			parser.error('argument -p/--param: expected KEY=VALUE, got {!r}'.format(pair))
+
+	if args.command == 'generate':
+		return _quietly(generate, args)
+	elif args.command == 'batch':
+		return _quietly(batch, args)
+	elif args.command == 'render':
+		return _quietly(render, args)
+	else:
+		from config import settings
+
+		if settings['env'] == 'DEV':
+			run_tests(settings.get('tests'))
+		elif settings['env'] == 'PROD':
+			pass
+
+	return 0
+
+
+
+if __name__ == '__main__':
+	sys.exit(main())
\ No newline at end of file
@@ -1,4 +1,59 @@
-import yaml
-
-with open('config.yml', r) as config:
-	settings = yaml.load(config)
\ No newline at end of file
+import hashlib, json, os, sys
+
+
+# Directory for files this project can rebuild at any time, in the user's cache directory rather than the source tree
+def cacheDirectory():
+	if os.name == 'nt':
+		base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), 'AppData', 'Local')
+	elif sys.platform == 'darwin':
+		base = os.path.join(os.path.expanduser('~'), 'Library', 'Caches')
+	else:
+		base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+
+	return os.path.join(base, 'MobiusTower')
+
+
+# Parsed settings are cached as JSON, so that most runs never import yaml at all; the file is named after the config path so that checkouts do not share it
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.yml')
+CACHE = os.path.join(cacheDirectory(), 'config-{}.json'.format(hashlib.sha1(PATH.encode('utf-8')).hexdigest()[:16]))
+
+_settings = None
+
+
+# Read config.yml once per process, from the JSON cache while it is newer than the YAML file
+def load(path = PATH, cache = CACHE):
+	global _settings
+
+	if _settings == None:
+		mtime = os.stat(path).st_mtime
+
+		try:
+			with open(cache, 'r', encoding = 'utf-8') as f:
+				cached = json.load(f)
+		except (OSError, ValueError):
+			cached = None
+
+		if not cached == None and cached.get('mtime') == mtime:
+			_settings = cached['settings']
+		else:
+			import yaml
+
+			with open(path, 'r', encoding = 'utf-8') as config:
+				_settings = yaml.safe_load(config) or {}
+
+			try:
+				os.makedirs(os.path.dirname(cache), exist_ok = True)
+				with open(cache, 'w', encoding = 'utf-8') as f:
+					json.dump({'mtime': mtime, 'settings': _settings}, f)
+			except OSError:
+				pass
+
+	return _settings
+
+
+# Keep 'from config import settings' working, loading on first access instead of at import time
+def __getattr__(name):
+	if name == 'settings':
+		return load()
+
+	raise AttributeError(name)
\ No newline at end of file
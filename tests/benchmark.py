@@ -0,0 +1,216 @@
+import argparse, json, os, platform, sys, tempfile, time, tracemalloc
+
+from Dungeon import Dungeon
+
+
+# Floor sizes, smallest first
+SIZES = [(119, 47), (500, 200), (1000, 1000), (4000, 4000)]
+
+# Parameter sweeps, each case is timed at every size
+ROOMS = [
+	{'bias': 0.0, 'tries': 50, 'amount': 20},
+	{'bias': 0.5, 'tries': 50, 'amount': 20},
+	{'bias': 1.0, 'tries': 500, 'amount': None}
+]
+MAZE = [0.0, 0.5, 1.0]
+
+SEED = 1
+
+# Differences smaller than this many seconds are timer noise, never regressions
+NOISE = 0.002
+
+
+'''
+Benchmark cases
+
+Every case is a function of a floor size returning (setup, step): setup builds whatever the step needs, and only the step is measured
+'''
+def _init(x, y):
+	return (lambda: None, lambda state: Dungeon(x, y, SEED))
+
+def _createRooms(x, y, bias, tries, amount):
+	def setup():
+		d = Dungeon(x, y, SEED)
+		d.setNumTries(tries)
+
+		# No amount means one room per 250 cells, enough to crowd the floor
+		d.setRoomAmount(amount if not amount == None else max(x * y // 250, 1))
+		return d
+
+	return (setup, lambda d: d.createRooms(bias))
+
+def _createMaze(x, y, bias):
+	def setup():
+		d = Dungeon(x, y, SEED)
+		d.createRooms()
+		return d
+
+	return (setup, lambda d: d.createMaze(bias))
+
+def _floor(x, y):
+	d = Dungeon(x, y, SEED)
+	d.createRooms()
+	d.createMaze()
+	return d
+
+def _str(x, y):
+	return (lambda: _floor(x, y), lambda d: str(d))
+
+def _fromMap(x, y):
+	def setup():
+		fd, path = tempfile.mkstemp(suffix = '.txt')
+		with os.fdopen(fd, 'w', encoding = 'utf-8') as f:
+			f.write(str(_floor(x, y)))
+		return path
+
+	return (setup, Dungeon.fromMap)
+
+def cases(x, y):
+	"""
+	Every (name, setup, step) to run at one floor size
+	"""
+	out = [('init', ) + _init(x, y)]
+
+	for p in ROOMS:
+		out.append(('createRooms[bias={bias},tries={tries},amount={amount}]'.format(**p), ) + _createRooms(x, y, **p))
+
+	for bias in MAZE:
+		out.append(('createMaze[bias={}]'.format(bias), ) + _createMaze(x, y, bias))
+
+	out.append(('__str__', ) + _str(x, y))
+	out.append(('fromMap', ) + _fromMap(x, y))
+
+	return out
+
+
+'''
+Measurement
+'''
+def measure(setup, step, repeat = 3, memory = True):
+	"""
+	Best wall time of @repeat runs, then the peak memory of one more run under tracemalloc, which is too slow to time with
+	"""
+	best = None
+	for r in range(0, repeat):
+		state = setup()
+
+		start = time.perf_counter()
+		step(state)
+		seconds = time.perf_counter() - start
+
+		best = seconds if best == None else min(best, seconds)
+		_cleanup(state)
+
+	peak = None
+	if memory:
+		state = setup()
+
+		tracemalloc.start()
+		step(state)
+		peak = tracemalloc.get_traced_memory()[1]
+		tracemalloc.stop()
+
+		_cleanup(state)
+
+	return best, peak
+
+def _cleanup(state):
+	# fromMap's setup leaves a map file behind
+	if isinstance(state, str) and os.path.exists(state):
+		os.remove(state)
+
+def run(sizes = SIZES, only = None, repeat = 3, memory = True, log = sys.stdout):
+	"""
+	Run every case at every size, returning the results keyed by case@size
+	"""
+	results = {}
+
+	for x, y in sizes:
+		for name, setup, step in cases(x, y):
+			if not only == None and not any([name.startswith(o) for o in only]):
+				continue
+
+			key = '{}@{}x{}'.format(name, x, y)
+			seconds, peak = measure(setup, step, repeat, memory)
+
+			results[key] = {
+				'seconds': seconds,
+				'peakBytes': peak,
+				'cellsPerSecond': x * y / seconds if seconds > 0 else None
+			}
+
+			if not log == None:
+				print('{:<60} {:>10.4f}s {:>14} {:>14}'.format(key, seconds, '-' if peak == None else '{:,}B'.format(peak), '{:,.0f} cells/s'.format(x * y / seconds) if seconds > 0 else '-'), file = log)
+
+	return results
+
+
+'''
+Baselines
+'''
+def save(results, path):
+	with open(path, 'w', encoding = 'utf-8') as f:
+		json.dump({'python': platform.python_version(), 'machine': platform.machine(), 'results': results}, f, indent = '\t', sort_keys = True)
+
+def load(path):
+	with open(path, 'r', encoding = 'utf-8') as f:
+		return json.load(f)['results']
+
+def compare(results, baseline, tolerance = 0.25):
+	"""
+	Every case that got slower, or used more memory, by more than @tolerance relative to @baseline
+
+	Returns (key, measure, baseline value, new value) for each regression
+	"""
+	regressions = []
+
+	for key, new in results.items():
+		if not key in baseline:
+			continue
+
+		for field in ('seconds', 'peakBytes'):
+			old = baseline[key].get(field)
+			if old == None or new[field] == None:
+				continue
+
+			if new[field] > old * (1 + tolerance) and (field != 'seconds' or new[field] - old > NOISE):
+				regressions.append((key, field, old, new[field]))
+
+	return regressions
+
+
+def main(argv = None):
+	"""
+	Command line entry point, returning the exit status: 1 if a regression against the baseline was found
+	"""
+	parser = argparse.ArgumentParser(prog = 'bench', description = 'Benchmark the dungeon generator')
+	parser.add_argument('--sizes', nargs = '+', default = ['{}x{}'.format(x, y) for x, y in SIZES], help = 'floor sizes as WxH')
+	parser.add_argument('--only', nargs = '+', help = 'only run cases whose name starts with one of these')
+	parser.add_argument('--repeat', type = int, default = 3)
+	parser.add_argument('--no-memory', action = 'store_true', help = 'skip the tracemalloc run')
+	parser.add_argument('--output', help = 'write the results to this JSON file')
+	parser.add_argument('--baseline', help = 'compare against the results in this JSON file')
+	parser.add_argument('--tolerance', type = float, default = 0.25)
+	args = parser.parse_args(argv)
+
+	sizes = [tuple([int(n) for n in size.lower().split('x')]) for size in args.sizes]
+	results = run(sizes, args.only, args.repeat, not args.no_memory)
+
+	if args.output:
+		save(results, args.output)
+
+	if args.baseline:
+		regressions = compare(results, load(args.baseline), args.tolerance)
+
+		for key, field, old, new in regressions:
+			# A baseline of zero, such as a case that allocated nothing, has no meaningful relative change
+			change = '{:+.0%}'.format(new / old - 1) if old > 0 else 'was 0'
+			print('REGRESSION {} {}: {:.4g} -> {:.4g} ({})'.format(key, field, old, new, change))
+
+		return 1 if len(regressions) > 0 else 0
+
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
\ No newline at end of file
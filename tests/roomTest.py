@@ -1,2 +0,0 @@
-def roomTest():
-	pass
\ No newline at end of file
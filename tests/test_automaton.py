@@ -0,0 +1,47 @@
+import random
+
+from Dungeon.Components.Automaton import Automaton
+from Dungeon.Components.Grid import Grid
+from Dungeon.Components.Symbols import CODES, PASSABLE, DEFAULT, LOCKED, PATH, ROOM, WALL
+
+def _step(grid, birth, survive, free):
+	# Brute-force generation: count the 8 neighbours of every free cell, beyond the edge counting as rock
+	rock = lambda x, y: not grid.inBounds((x, y)) or not grid.get((x, y)) in PASSABLE
+	out = Grid.fromBuffer(grid.xDim, grid.yDim, bytearray(grid.cells))
+
+	for x, y in free:
+		count = len([1 for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0) and rock(x + dx, y + dy)])
+		out.set((x, y), WALL if count in (survive if rock(x, y) else birth) else PATH)
+
+	return out
+
+def test_step_matches_brute_force():
+	rng = random.Random(4)
+
+	for xDim, yDim in [(1, 1), (1, 6), (6, 1), (2, 2), (7, 5), (16, 9)]:
+		for trial in range(0, 10):
+			grid = Grid(xDim, yDim)
+			for i in range(0, xDim * yDim // 5):
+				grid.set((rng.randrange(xDim), rng.randrange(yDim)), rng.choice([ROOM, WALL, LOCKED]))
+
+			free = [(x, y) for y in range(0, yDim) for x in range(0, xDim) if grid.get((x, y)) == DEFAULT]
+			birth, survive = rng.sample(range(0, 9), 4), rng.sample(range(0, 9), 5)
+
+			automaton = Automaton(grid)
+			automaton.randomize(rng, 0.45)
+			automaton.paint(grid, CODES[WALL], CODES[PATH])
+
+			for generation in range(0, 3):
+				expected = _step(grid, birth, survive, free)
+
+				automaton.step(birth, survive)
+				automaton.paint(grid, CODES[WALL], CODES[PATH])
+				assert str(grid) == str(expected)
+
+def test_corners_count_as_rock():
+	# Every neighbour of a lone open cell is beyond the edge, so a birth count of 8 fills it
+	grid = Grid(1, 1)
+	automaton = Automaton(grid)
+	automaton.step((8,), ())
+	automaton.paint(grid, CODES[WALL], CODES[PATH])
+	assert grid.get((0, 0)) == WALL
\ No newline at end of file
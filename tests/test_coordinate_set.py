@@ -0,0 +1,54 @@
+import random
+
+from Dungeon.Components.Grid import Grid
+from Dungeon.Components.Sets.CoordinateSet import CoordinateSet
+from Dungeon.Components.Sets.CoordinateSubset import CoordinateSubset
+
+def test_against_set():
+	rng = random.Random(0)
+
+	for trial in range(0, 50):
+		xDim, yDim = rng.randrange(1, 12), rng.randrange(1, 12)
+		coords = CoordinateSet(xDim, yDim, full = rng.random() < 0.5)
+		expected = set(coords)
+
+		for op in range(0, 40):
+			x0, y0 = rng.randrange(0, xDim), rng.randrange(0, yDim)
+			x1, y1 = rng.randrange(x0, xDim), rng.randrange(y0, yDim)
+			rect = set([(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)])
+
+			kind = rng.randrange(0, 4)
+			if kind == 0:
+				coords.addRect((x0, y0), (x1, y1))
+				expected |= rect
+			elif kind == 1:
+				coords.discardRect((x0, y0), (x1, y1))
+				expected -= rect
+			elif kind == 2:
+				coords.add((x0, y0))
+				expected.add((x0, y0))
+			else:
+				coords.discard((x0, y0))
+				expected.discard((x0, y0))
+
+			assert len(coords) == len(expected) and set(coords) == expected
+			assert all([(x, y) in coords for x, y in expected])
+
+def test_from_grid_and_sample():
+	grid = Grid.fromRows(['W  W', '    ', 'WWWW'])
+	coords = CoordinateSet.fromGrid(grid)
+	assert set(coords) == set([(1, 0), (2, 0), (0, 1), (1, 1), (2, 1), (3, 1)])
+
+	rng = random.Random(1)
+	assert set([coords.sample(rng) for i in range(0, 200)]) == set(coords)
+
+	coords.discardRect((0, 0), (3, 2))
+	assert len(coords) == 0 and coords.sample(rng) == None
+	assert not (5, 5) in coords and not (-1, 0) in coords
+
+def test_subset():
+	coords = CoordinateSubset([(1, 2), [3, 4], (1, 2)])
+	assert len(coords) == 2 and [3, 4] in coords
+
+	coords.discard((1, 2))
+	assert list(coords) == [(3, 4)] and coords.sample(random.Random(0)) == (3, 4)
\ No newline at end of file
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from Dungeon import Dungeon, Floor
+from Dungeon.Components.Grid import Grid
+
+def _floor():
+	return Dungeon.generate({'x_dim': 41, 'y_dim': 23}, 5)
+
+def test_round_trips():
+	dungeon = _floor()
+
+	for encoding in (Floor.RAW, Floor.NIBBLE, Floor.RLE):
+		loaded = Floor.unpack(Floor.pack(dungeon, encoding))
+		assert loaded.grid.read() == dungeon.grid.read()
+		assert (loaded.seed, loaded.params) == (dungeon.seed, dungeon.params)
+
+def test_odd_sizes_and_long_runs():
+	# An odd number of cells leaves half a nibble byte, and runs longer than 16 cells span several RLE bytes
+	dungeon = Dungeon(7, 5, 1, grid = Grid.fromRows(['W' * 7, 'W' + ' ' * 5 + 'W', 'R' * 7, 'W' * 7, '?' * 7]))
+
+	for encoding in (Floor.RAW, Floor.NIBBLE, Floor.RLE):
+		assert Floor.unpack(Floor.pack(dungeon, encoding)).grid.read() == dungeon.grid.read()
+
+def test_truncated():
+	data = Floor.pack(_floor(), Floor.RAW)
+
+	with pytest.raises(ValueError):
+		Floor.unpack(data[:-1])
+	with pytest.raises(ValueError):
+		Floor.unpack(b'XXXX' + data[4:])
+
+def test_mapped_load(tmp_path):
+	dungeon = _floor()
+	path = str(tmp_path / 'a.floor')
+	Floor.save(dungeon, path, Floor.RAW)
+
+	loaded = Floor.load(path)
+	assert isinstance(loaded.grid.cells, memoryview)
+	assert loaded.grid.read() == dungeon.grid.read()
+	assert Floor.readHeader(path)['x_dim'] == 41
+
+	# Edits to a copy-on-write mapping stay private to the process
+	loaded.grid.set((0, 0), 'R')
+	assert Floor.load(path, mapped = False).grid.get((0, 0)) == dungeon.grid.get((0, 0))
+
+def test_writable_load(tmp_path):
+	path = str(tmp_path / 'a.floor')
+	Floor.save(_floor(), path, Floor.RAW)
+
+	loaded = Floor.load(path, writable = True)
+	loaded.grid.set((0, 0), 'R')
+
+	assert Floor.load(path, mapped = False).grid.get((0, 0)) == 'R'
+
+def test_state():
+	dungeon = _floor()
+	loaded = Floor.unpack(Floor.pack(dungeon, Floor.NIBBLE, state = True))
+
+	assert [room.bounds() for room in loaded.rooms] == [room.bounds() for room in dungeon.rooms]
+	assert loaded.roomId(dungeon.rooms[0].bounds()[0]) == 1
+
+	# Both carry on generating the same way
+	assert loaded.placeItems(5) == dungeon.placeItems(5)
+	assert loaded.grid.read() == dungeon.grid.read()
+
+def test_version_1():
+	dungeon = _floor()
+	params = json.dumps(dungeon.params).encode('utf-8')
+	data = Floor._HEADER.pack(Floor.MAGIC, 1, Floor.RAW, 41, 23, dungeon.seed, len(params)) + params + bytes(dungeon.grid.read())
+
+	loaded = Floor.unpack(data)
+	assert loaded.params == dungeon.params and loaded.grid.read() == dungeon.grid.read()
+	assert loaded.rooms == []
\ No newline at end of file
@@ -0,0 +1,45 @@
+import pytest
+
+from Dungeon import Dungeon
+from Dungeon.Components.Grid import Grid
+from Dungeon.Components.Symbols import CODES, DEFAULT, WALL, PATH
+
+def test_from_rows():
+	grid = Grid.fromRows(['W R', PATH + '?W'])
+	assert (grid.xDim, grid.yDim) == (3, 2)
+	assert grid.get((1, 0)) == DEFAULT and grid.get((0, 1)) == PATH
+	assert grid.cells[2] == CODES['R']
+
+def test_from_rows_rejects_unknown_symbols():
+	# Control characters have small ordinals, close to real codes, and must not slip through as cells
+	for rows in (['W\tW'], ['W\x00W'], ['WaW'], ['WWW', 'WéW']):
+		with pytest.raises(ValueError):
+			Grid.fromRows(rows)
+
+def test_from_rows_rejects_ragged_rows():
+	with pytest.raises(ValueError):
+		Grid.fromRows(['WWW', 'W', 'WWWWW'])
+
+def test_from_map_round_trip(tmp_path):
+	dungeon = Dungeon.generate({'x_dim': 41, 'y_dim': 23}, 3)
+	path = tmp_path / 'floor.txt'
+	path.write_text(str(dungeon), encoding = 'utf-8')
+
+	loaded = Dungeon.fromMap(str(path))
+	assert loaded.grid.read() == dungeon.grid.read()
+	assert str(loaded) == str(dungeon)
+
+def test_from_map_pads_short_lines(tmp_path):
+	path = tmp_path / 'floor.txt'
+	path.write_text('WWW\nW\nWWW\n\n', encoding = 'utf-8')
+
+	loaded = Dungeon.fromMap(str(path))
+	assert (loaded.grid.xDim, loaded.grid.yDim) == (3, 3)
+	assert loaded.grid.get((2, 1)) == DEFAULT and loaded.grid.get((0, 1)) == WALL
+
+def test_from_map_rejects_unknown_symbols(tmp_path):
+	path = tmp_path / 'floor.txt'
+	path.write_text('W\tW\n', encoding = 'utf-8')
+
+	with pytest.raises(ValueError):
+		Dungeon.fromMap(str(path))
\ No newline at end of file
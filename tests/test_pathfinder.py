@@ -0,0 +1,57 @@
+import random
+from collections import deque
+
+from Dungeon import Dungeon
+from Dungeon.Components.Grid import Grid
+from Dungeon.Components.Pathfinder import Pathfinder
+from Dungeon.Components.Symbols import PASSABLE, PATH, WALL
+
+def _distances(grid, target):
+	# Brute-force breadth-first search
+	out = {target: 0} if grid.get(target) in PASSABLE else {}
+	queue = deque(out)
+	while len(queue) > 0:
+		x, y = queue.popleft()
+		for n in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+			if grid.inBounds(n) and not n in out and grid.get(n) in PASSABLE:
+				out[n] = out[(x, y)] + 1
+				queue.append(n)
+
+	return out
+
+def test_against_breadth_first_search():
+	rng = random.Random(4)
+	grid = Grid.fromRows([''.join([PATH if rng.random() < 0.7 else WALL for x in range(0, 25)]) for y in range(0, 15)])
+	paths = Pathfinder(grid)
+
+	for trial in range(0, 10):
+		target = (rng.randrange(0, 25), rng.randrange(0, 15))
+		expected = _distances(grid, target)
+
+		for y in range(0, 15):
+			for x in range(0, 25):
+				assert paths.distance((x, y), target) == expected.get((x, y))
+
+				# A* and the cached flow field agree on the length of the way there
+				path = paths.path((x, y), target)
+				assert (path == None) == (not (x, y) in expected)
+				if path != None:
+					assert len(path) == expected[(x, y)] + 1 and path[0] == (x, y) and path[-1] == target
+
+def test_path_without_field():
+	grid = Grid.fromRows([PATH * 5, WALL * 4 + PATH, PATH * 5])
+	path = Pathfinder(grid).path((0, 0), (0, 2))
+	assert len(path) == 11 and all([grid.get(coord) == PATH for coord in path])
+
+def test_invalidate():
+	dungeon = Dungeon(5, 3, 1, grid = Grid.fromRows([PATH * 5, PATH + WALL * 3 + PATH, PATH * 5]))
+	paths = dungeon.paths
+	assert paths.distance((2, 0), (2, 2)) == 6
+
+	# Writes through the dungeon reach the cached fields, in both directions
+	dungeon._setCell((0, 1), WALL)
+	assert paths.distance((2, 0), (2, 2)) == 6
+	dungeon._setCell((4, 1), WALL)
+	assert paths.distance((2, 0), (2, 2)) == None and paths.path((2, 0), (2, 2)) == None
+	dungeon._setCell((2, 1), PATH)
+	assert paths.distance((2, 0), (2, 2)) == 2 and len(paths.path((2, 0), (2, 2))) == 3
\ No newline at end of file
@@ -0,0 +1,65 @@
+import random
+from collections import deque
+
+from Dungeon import Dungeon
+from Dungeon.Components.Grid import Grid
+from Dungeon.Components.Regions import Regions
+from Dungeon.Components.Symbols import DEFAULT, PASSABLE, PATH, WALL
+
+def _components(grid):
+	# Brute-force flood fill over the passable cells
+	seen, pieces = {}, 0
+	for y in range(0, grid.yDim):
+		for x in range(0, grid.xDim):
+			if (x, y) in seen or not grid.get((x, y)) in PASSABLE:
+				continue
+
+			pieces += 1
+			seen[(x, y)] = pieces
+			queue = deque([(x, y)])
+			while len(queue) > 0:
+				cx, cy = queue.popleft()
+				for n in ((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+					if grid.inBounds(n) and not n in seen and grid.get(n) in PASSABLE:
+						seen[n] = pieces
+						queue.append(n)
+
+	return seen, pieces
+
+def test_labels_match_flood_fill():
+	rng = random.Random(2)
+
+	for trial in range(0, 30):
+		xDim, yDim = rng.randrange(1, 20), rng.randrange(1, 20)
+		grid = Grid.fromRows([''.join([PATH if rng.random() < 0.55 else WALL for x in range(0, xDim)]) for y in range(0, yDim)])
+
+		regions = Regions(grid)
+		seen, pieces = _components(grid)
+		assert regions.count == pieces
+
+		# Same partition, whatever the numbering
+		pairs = set([(seen[coord], regions.label(coord)) for coord in seen])
+		assert len(pairs) == pieces
+		assert all([regions.label((x, y)) == 0 for x in range(0, xDim) for y in range(0, yDim) if not (x, y) in seen])
+
+def test_connectors():
+	grid = Grid.fromRows([PATH + WALL + PATH, WALL + WALL + WALL, PATH + WALL + WALL])
+	regions = Regions(grid)
+
+	found = set([(i, frozenset((a, b))) for i, a, b in regions.connectors(grid, (WALL,))])
+	top, right, bottom = regions.label((0, 0)), regions.label((2, 0)), regions.label((0, 2))
+	assert found == set([(1, frozenset((top, right))), (3, frozenset((top, bottom)))])
+
+def test_connect_regions():
+	for seed in range(0, 5):
+		dungeon = Dungeon(61, 31, seed)
+		dungeon.createRooms()
+		dungeon.createMaze()
+		before = Regions(dungeon.grid).count
+		assert before > 1
+
+		# Every pair of regions one wall apart is joined; regions with no wall in common with the rest may stay apart
+		dungeon.connectRegions()
+		regions = Regions(dungeon.grid)
+		assert regions.connectors(dungeon.grid, (DEFAULT, WALL)) == []
+		assert regions.count < before
\ No newline at end of file
@@ -0,0 +1,42 @@
+import pytest
+
+from Dungeon.Components.Assets.Room import Room
+from Dungeon.Components.Grid import Grid
+from Dungeon.Components.Symbols import CODES
+
+def test_room():
+	r = Room.createRect((0, 0), (3, 2))
+	assert len(r) == 12 and r.isContiguous()
+	assert r.exists(coord = (2, 1)) == (2, 0)
+
+	# Cutting the middle column out would split the room in two
+	assert r.delete((1, 0)) and r.delete((1, 1))
+	assert not r.delete((1, 2))
+	assert r.exists(coord = (1, 2)) == (1, 2)
+
+	# Inserts must touch the room
+	assert not r.insert((5, 5))
+	assert r.insert((1, 1)) and r.insert((4, 1))
+	assert r.bounds() == ((0, 0), (4, 2))
+
+def test_segments_round_trip():
+	r = Room.createRect((0, 0), (4, 4))
+	for coord in [(2, 0), (2, 1), (2, 2), (1, 3)]:
+		assert r.delete(coord)
+
+	copy = Room.fromSegments(list(r.segments()))
+	assert list(copy.segments()) == list(r.segments())
+	assert len(copy) == len(r) and copy.isContiguous() and copy.bounds() == r.bounds()
+
+	# The two halves only meet along the bottom rows, so cutting (2, 3) and (2, 4) splits them
+	assert copy.delete((2, 3))
+	assert not copy.delete((2, 4))
+
+def test_render_out_of_bounds():
+	grid = Grid(5, 5)
+	Room.createRect((1, 1), (4, 4)).render(grid)
+	assert grid.cells.count(CODES['R']) == 16
+
+	for upperLeft, lowerRight in [((3, 3), (5, 4)), ((-1, 0), (2, 2)), ((0, 3), (2, 5))]:
+		with pytest.raises(ValueError):
+			Room.createRect(upperLeft, lowerRight).render(grid)
\ No newline at end of file